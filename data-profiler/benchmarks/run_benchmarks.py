@@ -0,0 +1,197 @@
+"""
+Throughput benchmarks for profile_dataset.py.
+
+Generates synthetic datasets over a rows × columns grid in CSV and Parquet
+(cached in benchmarks/data), profiles each one with every requested engine via
+the real CLI with --metrics, and reports rows/s and MB/s. Results go to
+benchmarks/results/<timestamp>.json; compare against a baseline to catch
+regressions:
+
+    python benchmarks/run_benchmarks.py --save-baseline
+    python benchmarks/run_benchmarks.py --compare        # exits 1 on a regression
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+BENCH_DIR = Path(__file__).resolve().parent
+SCRIPT = BENCH_DIR.parent / 'profile_dataset.py'
+DATA_DIR = BENCH_DIR / 'data'
+RESULTS_DIR = BENCH_DIR / 'results'
+BASELINE_FILE = BENCH_DIR / 'baseline.json'
+SEED = 42
+
+
+def int_list(arg: str) -> list[int]:
+    return [int(float(x)) for x in arg.split(',') if x.strip()]
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description='Benchmark profile_dataset.py throughput per engine and input format')
+    p.add_argument('--rows', type=int_list, default=[10_000, 100_000, 1_000_000], help='Comma-separated row counts (default: 10000,100000,1000000)')
+    p.add_argument('--cols', type=int_list, default=[10, 50], help='Comma-separated column counts (default: 10,50)')
+    p.add_argument('--max-cells', type=float, default=2e7, help='Skip grid points with more rows × columns than this (default: 2e7)')
+    p.add_argument('--formats', default='csv,parquet', help='Comma-separated input formats (default: csv,parquet)')
+    p.add_argument('--engines', default='fast,streaming', help='Comma-separated engines (default: fast,streaming; sweetviz is slow)')
+    p.add_argument('--repeat', type=int, default=3, help='Runs per case; the median is reported (default: 3)')
+    p.add_argument('--compare', nargs='?', const=str(BASELINE_FILE), default=None, metavar='BASELINE',
+                   help=f'Compare with a baseline results file (default: {BASELINE_FILE.name}) and exit 1 on a regression')
+    p.add_argument('--threshold', type=float, default=15.0, help='Percent drop in rows/s that counts as a regression (default: 15)')
+    p.add_argument('--save-baseline', action='store_true', help=f'Also write the results to {BASELINE_FILE.name}')
+    return p.parse_args()
+
+
+def synthetic_frame(rows: int, cols: int, seed: int = SEED) -> pd.DataFrame:
+    """Mix of column kinds seen in real extracts: ints, floats with NaNs, low/high-cardinality strings, timestamps."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for j in range(cols):
+        kind = j % 5
+        if kind == 0:
+            data[f'int_{j}'] = rng.integers(0, 1_000_000, rows)
+        elif kind == 1:
+            x = rng.normal(100, 15, rows)
+            x[rng.random(rows) < 0.05] = np.nan
+            data[f'float_{j}'] = x
+        elif kind == 2:
+            data[f'cat_{j}'] = rng.choice(['Norway', 'Sweden', 'Denmark', 'Finland', 'Iceland'], rows)
+        elif kind == 3:
+            data[f'text_{j}'] = pd.Series(rng.integers(0, rows, rows)).map('id-{:08d}'.format)
+        else:
+            data[f'ts_{j}'] = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365 * 86400, rows), unit='s')
+    return pd.DataFrame(data)
+
+
+def dataset(rows: int, cols: int, fmt: str) -> Path:
+    path = DATA_DIR / f'bench_{rows}x{cols}.{fmt}'
+    if path.exists():
+        return path
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    print(f'[INFO] Generating {path.name}…')
+    df = synthetic_frame(rows, cols)
+    tmp = path.with_suffix('.tmp')
+    if fmt == 'csv':
+        df.to_csv(tmp, index=False)
+    else:
+        df.to_parquet(tmp, index=False)
+    tmp.replace(path)
+    return path
+
+
+def run_once(path: Path, engine: str) -> dict:
+    """Profile `path` through the CLI in a scratch directory and return its --metrics report."""
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics_path = Path(tmp) / 'metrics.json'
+        cmd = [sys.executable, str(SCRIPT), '--mode', 'local', '--input', str(path), '--engine', engine,
+               '--output-name', 'bench', '--metrics', str(metrics_path)]
+        proc = subprocess.run(cmd, cwd=tmp, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f'{" ".join(cmd[1:])} failed:\n{proc.stderr[-2000:]}')
+        return json.loads(metrics_path.read_text(encoding='utf-8'))
+
+
+def run_case(rows: int, cols: int, fmt: str, engine: str, repeat: int) -> dict:
+    path = dataset(rows, cols, fmt)
+    runs = [run_once(path, engine) for _ in range(max(1, repeat))]
+    wall = statistics.median(r['wall_s'] for r in runs)
+    mb = path.stat().st_size / 2**20
+    phases = {}
+    for name in runs[0]['phases']:
+        if '/' not in name:
+            phases[name] = round(statistics.median(r['phases'].get(name, {}).get('wall_s', 0.0) for r in runs), 4)
+    return {
+        'engine': engine,
+        'format': fmt,
+        'rows': rows,
+        'cols': cols,
+        'file_mb': round(mb, 2),
+        'wall_s': round(wall, 4),
+        'rows_per_s': round(rows / wall, 1),
+        'mb_per_s': round(mb / wall, 2),
+        'peak_rss_mb': max(r['peak_rss_mb'] or 0 for r in runs),
+        'phases': phases,
+    }
+
+
+def case_key(r: dict) -> str:
+    return f"{r['engine']}/{r['format']}/{r['rows']}x{r['cols']}"
+
+
+def print_results(results: list[dict]):
+    print(f"{'case':<34}{'wall s':>9}{'rows/s':>14}{'MB/s':>9}{'peak MB':>10}")
+    for r in results:
+        print(f"{case_key(r):<34}{r['wall_s']:>9.3f}{r['rows_per_s']:>14,.0f}{r['mb_per_s']:>9.1f}{r['peak_rss_mb']:>10.1f}")
+
+
+def compare(results: list[dict], baseline_path: Path, threshold: float) -> int:
+    try:
+        baseline = {case_key(r): r for r in json.loads(baseline_path.read_text(encoding='utf-8'))['results']}
+    except FileNotFoundError:
+        print(f'[ERROR] Baseline not found: {baseline_path} (create one with --save-baseline)', file=sys.stderr)
+        return 2
+    regressions = 0
+    print(f'\n[INFO] Compared with {baseline_path.name} (threshold {threshold:.0f}%):')
+    for r in results:
+        base = baseline.get(case_key(r))
+        if base is None:
+            print(f'         {case_key(r):<34} new')
+            continue
+        change = 100.0 * (r['rows_per_s'] / base['rows_per_s'] - 1)
+        flag = 'REGRESSION' if change < -threshold else ''
+        regressions += bool(flag)
+        print(f'         {case_key(r):<34} {change:+7.1f}% rows/s  {flag}')
+    if regressions:
+        print(f'[ERROR] {regressions} regression(s) beyond {threshold:.0f}%.', file=sys.stderr)
+        return 1
+    print('[INFO] No regressions.')
+    return 0
+
+
+def main():
+    args = parse_args()
+    formats = [f.strip() for f in args.formats.split(',') if f.strip()]
+    engines = [e.strip() for e in args.engines.split(',') if e.strip()]
+    grid = [(r, c) for r in args.rows for c in args.cols if r * c <= args.max_cells]
+    skipped = len(args.rows) * len(args.cols) - len(grid)
+    if skipped:
+        print(f'[INFO] Skipping {skipped} grid point(s) above --max-cells {args.max_cells:,.0f}.')
+
+    results = []
+    for rows, cols in grid:
+        for fmt in formats:
+            for engine in engines:
+                print(f'[INFO] {engine} / {fmt} / {rows:,} × {cols}…')
+                results.append(run_case(rows, cols, fmt, engine, args.repeat))
+
+    print()
+    print_results(results)
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    payload = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'repeat': args.repeat,
+        'results': results,
+    }
+    out = RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    out.write_text(json.dumps(payload, indent=2), encoding='utf-8')
+    print(f'[INFO] Wrote results to: {out}')
+    if args.save_baseline:
+        BASELINE_FILE.write_text(json.dumps(payload, indent=2), encoding='utf-8')
+        print(f'[INFO] Saved baseline: {BASELINE_FILE}')
+    if args.compare:
+        sys.exit(compare(results, Path(args.compare), args.threshold))
+
+
+if __name__ == '__main__':
+    main()
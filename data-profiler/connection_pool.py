@@ -0,0 +1,59 @@
+"""
+Bounded pool of Snowflake (or stand-in) connections.
+
+Connections are opened on first use, up to `size`, and handed back to the pool
+after each query, so one run pays the login handshake at most `size` times no
+matter how many queries it executes. Callers block while all connections are
+busy. A connection whose query raised is closed rather than reused.
+"""
+import queue
+import threading
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    def __init__(self, factory, size: int):
+        self._factory = factory
+        self.size = max(1, size)
+        self._idle: queue.Queue = queue.Queue(maxsize=self.size)
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._open: list = []
+        self.opened = 0
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._factory()
+                with self._lock:
+                    self._open.append(conn)
+                    self.opened += 1
+            try:
+                yield conn
+            except BaseException:
+                self._discard(conn)
+                raise
+            self._idle.put_nowait(conn)
+
+    def _discard(self, conn):
+        with self._lock:
+            if conn in self._open:
+                self._open.remove(conn)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        with self._lock:
+            conns, self._open = self._open, []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        while not self._idle.empty():
+            self._idle.get_nowait()
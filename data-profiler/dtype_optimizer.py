@@ -0,0 +1,103 @@
+"""
+Memory-optimizing dtype selection before profiling.
+
+Numeric columns are downcast only when the conversion is lossless, and
+low-cardinality string columns become `category`. Where the file format allows
+it, the narrow dtypes are chosen while reading so the wide ones are never
+allocated.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+CATEGORY_RATIO = 0.5      # distinct / rows at or below which strings become `category`
+HEAD_ROWS = 20_000        # rows read to pick CSV dtypes up front
+DICT_BYTES_PER_VALUE = 2  # Parquet column chunks this dense are dictionary codes of a low-cardinality column
+
+
+def is_stringish(s: pd.Series) -> bool:
+    return pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s)
+
+
+def low_cardinality(s: pd.Series, ratio: float = CATEGORY_RATIO) -> bool:
+    return len(s) > 0 and s.nunique(dropna=True) <= ratio * len(s)
+
+
+def optimize_series(s: pd.Series, ratio: float = CATEGORY_RATIO) -> pd.Series:
+    if pd.api.types.is_bool_dtype(s):
+        return s
+    if pd.api.types.is_integer_dtype(s):
+        return pd.to_numeric(s, downcast='integer')
+    if pd.api.types.is_float_dtype(s):
+        narrow = s.astype('float32')
+        if np.array_equal(narrow.to_numpy(np.float64), s.to_numpy(np.float64), equal_nan=True):
+            return narrow
+        return s
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s
+    if is_stringish(s):
+        if low_cardinality(s, ratio):
+            return s.astype('category')
+        if pd.api.types.is_object_dtype(s) and pd.api.types.infer_dtype(s, skipna=True) == 'string':
+            try:
+                return s.astype('string[pyarrow]')
+            except ImportError:
+                return s
+    return s
+
+
+def optimize_dtypes(df: pd.DataFrame, ratio: float = CATEGORY_RATIO, report: bool = True) -> pd.DataFrame:
+    before = df.memory_usage(deep=True, index=False)
+    dtypes_before = df.dtypes
+    out = df.copy(deep=False)
+    for name in df.columns:
+        out[name] = optimize_series(df[name], ratio)
+    if report:
+        print_memory_report(before, out.memory_usage(deep=True, index=False), dtypes_before, out.dtypes)
+    return out
+
+
+def fmt_bytes(n: float) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if abs(n) < 1024:
+            return f'{n:,.1f} {unit}'
+        n /= 1024
+    return f'{n:,.1f} GB'
+
+
+def print_memory_report(before: pd.Series, after: pd.Series, dtypes_before: pd.Series, dtypes_after: pd.Series, top: int = 10):
+    total_before, total_after = before.sum(), after.sum()
+    saved = 100.0 * (1 - total_after / total_before) if total_before else 0.0
+    print(f'[INFO] Memory: {fmt_bytes(total_before)} → {fmt_bytes(total_after)} ({saved:.0f}% saved)')
+    changed = [c for c in before.index if str(dtypes_before[c]) != str(dtypes_after[c])]
+    for name in sorted(changed, key=lambda c: after[c] - before[c])[:top]:
+        print(f'         {name}: {dtypes_before[name]} → {dtypes_after[name]} '
+              f'({fmt_bytes(before[name])} → {fmt_bytes(after[name])})')
+
+
+def csv_read_dtypes(path: Path, encoding: str | None, sep: str, usecols: list[str] | None = None) -> dict:
+    """Pick `category` for low-cardinality string columns from the head of a CSV, to pass to read_csv."""
+    head = pd.read_csv(path, encoding=encoding, sep=sep, usecols=usecols, nrows=HEAD_ROWS)
+    return {name: 'category' for name in head.columns if is_stringish(head[name]) and low_cardinality(head[name])}
+
+
+def parquet_dictionary_columns(path: Path, columns: list[str] | None = None) -> list[str]:
+    """String columns whose first row group is densely dictionary-encoded; read them as categories."""
+    import pyarrow.parquet as pq
+    md = pq.ParquetFile(path).metadata
+    if md.num_row_groups == 0:
+        return []
+    rg = md.row_group(0)
+    out = []
+    for i in range(rg.num_columns):
+        col = rg.column(i)
+        name = col.path_in_schema
+        if columns is not None and name not in columns:
+            continue
+        if col.physical_type != 'BYTE_ARRAY' or not any('DICTIONARY' in e for e in col.encodings):
+            continue
+        if col.num_values and col.total_uncompressed_size / col.num_values <= DICT_BYTES_PER_VALUE:
+            out.append(name)
+    return out
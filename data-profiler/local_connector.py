@@ -0,0 +1,80 @@
+"""
+Local stand-in for snowflake.connector, backed by DuckDB.
+
+Set SNOWFLAKE_STANDIN in .env to a DuckDB database file (or ':memory:') and
+--mode snowflake runs query.sql against it instead of Snowflake. Only the parts
+of the connector API that profile_dataset.py uses are implemented; results are
+exposed as independently downloadable batches like Snowflake's ResultBatch.
+"""
+import pandas as pd
+
+try:
+    import duckdb
+except Exception:
+    duckdb = None
+
+
+BATCH_ROWS = 50_000
+
+
+class LocalResultBatch:
+    """Mimics snowflake.connector.result_batch.ResultBatch for a slice of a result."""
+
+    def __init__(self, table):
+        self._table = table
+        self.rowcount = table.num_rows
+
+    def to_arrow(self, connection=None):
+        return self._table
+
+    def to_pandas(self, connection=None, **kwargs):
+        return self._table.to_pandas()
+
+
+class LocalCursor:
+    def __init__(self, conn):
+        self._cur = conn.cursor()
+        self._table = None
+        self.description = None
+
+    def execute(self, sql: str, params=None):
+        self._cur.execute(sql, params)
+        self.description = self._cur.description
+        self._table = self._cur.fetch_arrow_table() if self.description else None
+        return self
+
+    def get_result_batches(self) -> list[LocalResultBatch]:
+        if self._table is None:
+            return []
+        return [LocalResultBatch(self._table.slice(offset, BATCH_ROWS)) for offset in range(0, self._table.num_rows, BATCH_ROWS)]
+
+    def fetch_pandas_all(self) -> pd.DataFrame:
+        return self._table.to_pandas() if self._table is not None else pd.DataFrame()
+
+    def fetch_pandas_batches(self):
+        for batch in self.get_result_batches():
+            yield batch.to_pandas()
+
+    def fetchall(self):
+        return [tuple(r.values()) for r in self._table.to_pylist()] if self._table is not None else []
+
+    def close(self):
+        self._cur.close()
+
+
+class LocalConnection:
+    def __init__(self, database: str):
+        self.database = database
+        self._conn = duckdb.connect(database)
+
+    def cursor(self) -> LocalCursor:
+        return LocalCursor(self._conn)
+
+    def close(self):
+        self._conn.close()
+
+
+def connect(database: str = ':memory:') -> LocalConnection:
+    if duckdb is None:
+        raise RuntimeError('duckdb is required for the local Snowflake stand-in (pip install duckdb)')
+    return LocalConnection(database)
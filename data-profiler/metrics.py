@@ -0,0 +1,182 @@
+"""
+Per-phase wall time, CPU time and peak RSS for --metrics.
+
+Phases are opened with `with phase('read'):` (or `timed_iter()` for the time
+spent pulling items from a generator) and nest: a 'sniff' inside 'load' is
+reported as 'load/sniff'. Each thread nests its own phases, and repeated or
+concurrent phases accumulate. CPU time is process-wide, so it includes download
+threads. Peak RSS is sampled in a background thread
+when psutil is installed; otherwise it is the process high-water mark from
+getrusage at the end of the phase.
+"""
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import psutil
+except Exception:
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+SAMPLE_INTERVAL = 0.005  # seconds between RSS samples
+
+
+def max_rss_bytes() -> int | None:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class PhaseRecorder:
+    def __init__(self):
+        self.phases: dict[str, dict] = {}
+        self._local = threading.local()
+        self._open: list[dict] = []  # peak-RSS trackers of the phases currently open
+        self._lock = threading.Lock()
+        self._sampler = None
+        self._stop = threading.Event()
+        self._process = psutil.Process() if psutil is not None else None
+        self.started = None
+
+    @property
+    def _stack(self) -> list[str]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @property
+    def rss_source(self) -> str | None:
+        if self._process is not None:
+            return 'psutil'
+        return 'getrusage' if resource is not None else None
+
+    def _rss(self) -> int | None:
+        if self._process is not None:
+            return self._process.memory_info().rss
+        return max_rss_bytes()
+
+    def _sample(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            rss = self._rss()
+            with self._lock:
+                for tracker in self._open:
+                    tracker['peak'] = max(tracker['peak'], rss)
+
+    def start(self):
+        """Start the run clock and, with psutil, the RSS sampler."""
+        self.started = (time.perf_counter(), time.process_time(), datetime.now())
+        self._run = {'peak': self._rss() or 0}
+        self._open.append(self._run)
+        if self._process is not None and self._sampler is None:
+            self._sampler = threading.Thread(target=self._sample, daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+    def restart(self):
+        """Forget recorded phases and start over in the current process (e.g. in a forked worker)."""
+        self.stop()
+        self.__init__()
+        self.start()
+
+    @contextmanager
+    def phase(self, name: str):
+        path = '/'.join([*self._stack, name])
+        self._stack.append(name)
+        tracker = {'peak': self._rss() or 0} if self.started else None
+        with self._lock:
+            # created on entry so parents are listed before their children
+            entry = self.phases.setdefault(path, {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'peak_rss_mb': None})
+            if tracker is not None:
+                self._open.append(tracker)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            self._stack.pop()
+            rss = self._rss() if tracker is not None else None
+            with self._lock:
+                entry['calls'] += 1
+                entry['wall_s'] += wall
+                entry['cpu_s'] += cpu
+                if tracker is not None:
+                    self._open = [t for t in self._open if t is not tracker]
+                    peak = max(tracker['peak'], rss or 0) / 2**20
+                    entry['peak_rss_mb'] = max(entry['peak_rss_mb'] or 0.0, peak)
+
+    def merge(self, phases: dict):
+        """Fold in phases recorded elsewhere (e.g. by --all worker processes)."""
+        for path, other in phases.items():
+            entry = self.phases.setdefault(path, {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'peak_rss_mb': None})
+            entry['calls'] += other['calls']
+            entry['wall_s'] += other['wall_s']
+            entry['cpu_s'] += other['cpu_s']
+            if other['peak_rss_mb'] is not None:
+                entry['peak_rss_mb'] = max(entry['peak_rss_mb'] or 0.0, other['peak_rss_mb'])
+
+    def report(self, **extra) -> dict:
+        wall0, cpu0, started_at = self.started
+        peak = max(self._run['peak'], self._rss() or 0)
+        return {
+            'started_at': started_at.isoformat(timespec='seconds'),
+            'wall_s': round(time.perf_counter() - wall0, 4),
+            'cpu_s': round(time.process_time() - cpu0, 4),
+            'peak_rss_mb': round(peak / 2**20, 1) if peak else None,
+            'rss_source': self.rss_source,
+            **extra,
+            'phases': {
+                path: {**e, 'wall_s': round(e['wall_s'], 4), 'cpu_s': round(e['cpu_s'], 4),
+                       'peak_rss_mb': None if e['peak_rss_mb'] is None else round(e['peak_rss_mb'], 1)}
+                for path, e in self.phases.items()
+            },
+        }
+
+    def write(self, path: Path, **extra) -> dict:
+        self.stop()
+        report = self.report(**extra)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2, default=str), encoding='utf-8')
+        return report
+
+
+METRICS = PhaseRecorder()
+
+
+def phase(name: str):
+    return METRICS.phase(name)
+
+
+def timed_iter(iterable, name: str):
+    """Yield from `iterable`, recording the time spent producing each item as phase `name`."""
+    it = iter(iterable)
+    while True:
+        with phase(name):
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+        yield item
+
+
+def print_summary(report: dict):
+    print(f"[INFO] Metrics: {report['wall_s']:.2f}s wall, {report['cpu_s']:.2f}s CPU, peak RSS {report['peak_rss_mb']} MB")
+    for path, e in report['phases'].items():
+        indent = '  ' * path.count('/')
+        print(f"         {indent}{path.rsplit('/', 1)[-1]:<12} {e['wall_s']:8.3f}s wall {e['cpu_s']:8.3f}s CPU"
+              + (f"  {e['peak_rss_mb']:8.1f} MB" if e['peak_rss_mb'] is not None else ''))
@@ -1,14 +1,31 @@
 import argparse
+import gzip
+import operator
 import os
+import re
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 import glob
+import json
+import time
 
+import numpy as np
 import pandas as pd
 import sweetviz as sv
 from dotenv import load_dotenv
 
+from connection_pool import ConnectionPool
+from dtype_optimizer import csv_read_dtypes, optimize_dtypes, parquet_dictionary_columns
+from fast_profile import profile_dataframe
+from metrics import METRICS, phase, print_summary, timed_iter
+from profile_report import render_index, write_report
+from profile_stats import ProfileAccumulator, to_python
+from pushdown import DIALECTS, aggregate_sql, build_profile, column_kinds, describe_sql
+from result_cache import ResultCache, cache_key
+
 # Import snowflake connector lazily
 try:
     import snowflake.connector
@@ -19,8 +36,23 @@ except Exception:
 ROOT_DIR = Path('.').resolve()
 INPUT_DIR = ROOT_DIR / 'input'
 OUTPUT_DIR = ROOT_DIR / 'output'
+SPILL_DIR = ROOT_DIR / 'spill'
+CACHE_DIR = ROOT_DIR / 'cache'
+BATCH_STATE_FILE = OUTPUT_DIR / '.batch_state.json'
 DEFAULT_SQL_FILE = ROOT_DIR / 'query.sql'
 DEMO_FILENAME = 'demo_data.csv'
+SNIFF_BYTES = 1_000_000
+SAMPLE_SEED = 42
+SAMPLE_CLAUSES = {
+    # Snowflake cannot seed fixed-size (ROWS) sampling; use --sample-pct for repeatable warehouse samples
+    'snowflake': {'rows': 'SAMPLE ROW ({n} ROWS)', 'pct': 'SAMPLE BERNOULLI ({pct}) SEED ({seed})'},
+    'duckdb': {'rows': 'USING SAMPLE {n} ROWS (reservoir, {seed})', 'pct': 'USING SAMPLE {pct} PERCENT (bernoulli, {seed})'},
+}
+FILTER_RE = re.compile(r'^\s*(?P<col>.+?)\s*(?P<op>==|!=|<=|>=|<|>|=|\bnot in\b|\bin\b)\s*(?P<value>.+?)\s*$', re.IGNORECASE)
+FILTER_OPS = {
+    '==': operator.eq, '!=': operator.ne, '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+    'in': lambda s, v: s.isin(v), 'not in': lambda s, v: ~s.isin(v),
+}
 
 
 def parse_args() -> argparse.Namespace:
@@ -32,10 +64,93 @@ def parse_args() -> argparse.Namespace:
         help='local: read demo_data.csv (root) or CSV/Parquet from ./input; snowflake: run ./query.sql against Snowflake',
     )
     p.add_argument('--input', default=None, help="Filename for local mode. Use 'demo_data.csv' (root) or a file under ./input (e.g., mydata.csv).")
+    p.add_argument(
+        '--all',
+        action='store_true',
+        help='Local mode: profile every CSV/Parquet file in ./input in parallel, one report per file plus output/index.html',
+    )
+    p.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes for --all (default: CPU count)')
     p.add_argument('--limit', type=int, default=None, help='Optional LIMIT (applied to SQL mode)')
-    p.add_argument('--target', default=None, help='Optional target column for Sweetviz target analysis')
-    p.add_argument('--sample', type=int, default=None, help='Optional random row sample size after fetch')
+    p.add_argument('--target', default=None, help='Optional target column for target analysis (sweetviz and fast engines)')
+    p.add_argument(
+        '--sample',
+        type=int,
+        default=None,
+        help='Optional random sample of N rows, taken at the source (SQL SAMPLE in snowflake mode, reservoir sampling while reading in local mode). '
+        'In snowflake mode a cached unsampled result of the same query is sampled locally with --sample-seed instead, '
+        'which picks different rows than SAMPLE; use --refresh to sample in the warehouse',
+    )
+    p.add_argument('--sample-pct', type=float, default=None, help='Optional Bernoulli sample of P percent of rows (alternative to --sample)')
+    p.add_argument('--sample-seed', type=int, default=SAMPLE_SEED, help=f'Seed for sampling (default: {SAMPLE_SEED})')
     p.add_argument('--output-name', default=None, help='Output HTML filename (written to ./output)')
+    p.add_argument(
+        '--engine',
+        choices=['sweetviz', 'fast', 'streaming'],
+        default='sweetviz',
+        help='sweetviz: full Sweetviz report (default); fast: vectorized NumPy profile for wide tables (HTML + JSON); '
+             'streaming: chunked out-of-core profile (HTML + JSON)',
+    )
+    p.add_argument('--chunksize', type=int, default=100_000, help='Rows per chunk for --engine streaming (default: 100000)')
+    p.add_argument(
+        '--sql',
+        nargs='+',
+        default=None,
+        metavar='PATH',
+        help='Snowflake mode: SQL files and/or directories of .sql files to run instead of ./query.sql; '
+             'queries run concurrently and each result gets its own report (output/<file stem>.html)',
+    )
+    p.add_argument(
+        '--max-connections',
+        type=int,
+        default=4,
+        help='Snowflake mode: connection pool size, i.e. how many queries run at once (default: 4)',
+    )
+    p.add_argument('--fetch-workers', type=int, default=4, help='Parallel result-batch downloads in snowflake mode (default: 4)')
+    p.add_argument(
+        '--spill',
+        action='store_true',
+        help='Snowflake mode: stream result batches into ./spill/<report>.parquet instead of holding them in memory, then profile from that file',
+    )
+    p.add_argument(
+        '--no-optimize',
+        action='store_true',
+        help='Keep pandas default dtypes instead of downcasting numerics and categorizing low-cardinality strings before profiling',
+    )
+    p.add_argument('--no-cache', action='store_true', help='Snowflake mode: do not read or write the local result cache')
+    p.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Snowflake mode: re-run the query and overwrite the cached result; with --incremental: discard the saved state and rebuild',
+    )
+    p.add_argument('--cache-ttl', type=float, default=24.0, help='Hours a cached Snowflake result stays valid (default: 24)')
+    p.add_argument('--cache-max-mb', type=float, default=2048.0, help='Size budget of ./cache before LRU eviction (default: 2048)')
+    p.add_argument('--columns', default=None, help='Comma-separated columns to profile (local mode; only these are read from disk)')
+    p.add_argument(
+        '--filter',
+        action='append',
+        default=None,
+        help="Row filter for local mode, e.g. \"country == Norway\" or \"age >= 30\" or \"type in Basic,Premium\". "
+             'Repeat to AND several filters. Pushed down to pyarrow for Parquet.',
+    )
+    p.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Keep mergeable column sketches next to the report and only profile what is new since the last run: '
+             'new files under --input (a directory, default ./input) in local mode, rows above --watermark-column in snowflake mode',
+    )
+    p.add_argument(
+        '--pushdown',
+        action='store_true',
+        help='Snowflake mode: compute the profile in the warehouse with one aggregate query (approximate distinct counts, '
+             'percentiles and top-k) instead of fetching rows',
+    )
+    p.add_argument(
+        '--metrics',
+        default=None,
+        metavar='OUT_JSON',
+        help='Write wall time, CPU time and peak RSS per phase (sniff, read, fetch, sample, analyze, render, …) to this JSON file',
+    )
+    p.add_argument('--watermark-column', default=None, help='Snowflake mode with --incremental: monotonically increasing column marking new rows')
     return p.parse_args()
 
 
@@ -102,47 +217,240 @@ def find_local_file(user_filename: str | None) -> Path:
     return Path(candidates[0]).resolve()
 
 
-def read_local_dataframe(path: Path) -> pd.DataFrame:
+def find_partition_files(root: Path) -> list[Path]:
+    """CSV/Parquet files under `root`, recursively (e.g. Hive-style date=... partitions), for --incremental."""
+    if root.is_file():
+        return [root.resolve()]
+    return sorted(p.resolve() for p in root.rglob('*') if p.suffix.lower() in ('.csv', '.parquet') and p.is_file())
+
+
+def find_local_files() -> list[Path]:
+    """All CSV/Parquet files in INPUT_DIR, for --all."""
+    candidates = glob.glob(str(INPUT_DIR / '*.csv')) + glob.glob(str(INPUT_DIR / '*.parquet'))
+    return [Path(c).resolve() for c in sorted(candidates)]
+
+
+def sniff_csv(path: Path) -> tuple[str, str]:
+    """Guess (encoding, delimiter) from the head of the file only, so large files are never read whole."""
+    import csv, chardet
+    with phase('sniff'):
+        with path.open('rb') as f:
+            raw = f.read(SNIFF_BYTES)
+        enc_guess = (chardet.detect(raw).get('encoding') or 'utf-8')
+        try:
+            sample = raw[:100000].decode(enc_guess, errors='ignore')
+        except Exception:
+            enc_guess = 'utf-8'
+            sample = raw[:100000].decode(enc_guess, errors='ignore')
+        sniffer = csv.Sniffer()
+        try:
+            dialect = sniffer.sniff(sample)
+            sep = dialect.delimiter
+        except Exception:
+            sep = ','
+        return enc_guess, sep
+
+
+def parse_value(raw: str):
+    raw = raw.strip()
+    if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in '\'"':
+        return raw[1:-1]
+    for cast in (int, float):
+        try:
+            return cast(raw)
+        except ValueError:
+            pass
+    if raw.lower() in ('true', 'false'):
+        return raw.lower() == 'true'
+    return raw
+
+
+def parse_columns(arg: str | None) -> list[str] | None:
+    if not arg:
+        return None
+    return [c.strip() for c in arg.split(',') if c.strip()]
+
+
+def parse_filters(exprs: list[str] | None) -> list[tuple] | None:
+    """Parse '--filter' expressions into pyarrow-style (column, op, value) tuples (ANDed)."""
+    if not exprs:
+        return None
+    filters = []
+    for expr in exprs:
+        m = FILTER_RE.match(expr)
+        if not m:
+            print(f"[ERROR] Could not parse filter: {expr!r} (expected '<column> <op> <value>')", file=sys.stderr)
+            sys.exit(2)
+        op = m.group('op').lower()
+        op = '==' if op == '=' else op
+        raw = m.group('value')
+        value = [parse_value(v) for v in raw.split(',')] if op in ('in', 'not in') else parse_value(raw)
+        filters.append((m.group('col').strip().strip('"'), op, value))
+    return filters
+
+
+def needed_columns(columns: list[str] | None, filters: list[tuple] | None) -> list[str] | None:
+    """Columns to read from disk: the projection plus any column only referenced by a filter."""
+    if columns is None:
+        return None
+    return columns + [c for c, _, _ in filters or [] if c not in columns]
+
+
+def check_columns(available: list[str], columns: list[str] | None, filters: list[tuple] | None):
+    wanted = (columns or []) + [c for c, _, _ in filters or []]
+    missing = [c for c in wanted if c not in available]
+    if missing:
+        print(f"[ERROR] Unknown column(s): {', '.join(missing)}. Available: {', '.join(available)}", file=sys.stderr)
+        sys.exit(4)
+
+
+def apply_filters(df: pd.DataFrame, filters: list[tuple] | None, columns: list[str] | None = None) -> pd.DataFrame:
+    """Pandas-side equivalent of the pyarrow filter pushdown, used for CSV input."""
+    if filters:
+        mask = pd.Series(True, index=df.index)
+        for col, op, value in filters:
+            mask &= FILTER_OPS[op](df[col], value).fillna(False).astype(bool)
+        df = df[mask]
+    if columns is not None:
+        df = df[columns]
+    return df
+
+
+def row_group_may_match(row_group, schema_names: list[str], filters: list[tuple]) -> bool:
+    """Use Parquet min/max statistics to decide whether a row group can contain matching rows."""
+    for col, op, value in filters:
+        stats = row_group.column(schema_names.index(col)).statistics
+        if stats is None or not stats.has_min_max:
+            continue
+        lo, hi = stats.min, stats.max
+        try:
+            if op == '==' and (value < lo or value > hi):
+                return False
+            if op == '!=' and lo == hi == value:
+                return False
+            if op == '<' and lo >= value:
+                return False
+            if op == '<=' and lo > value:
+                return False
+            if op == '>' and hi <= value:
+                return False
+            if op == '>=' and hi < value:
+                return False
+            if op == 'in' and all(v < lo or v > hi for v in value):
+                return False
+        except TypeError:
+            # value and statistics of different types; let the row-level filter decide
+            continue
+    return True
+
+
+def read_csv_header(path: Path, encoding: str, sep: str) -> list[str]:
+    return list(pd.read_csv(path, encoding=encoding, sep=sep, nrows=0).columns)
+
+
+def read_local_dataframe(path: Path, columns: list[str] | None = None, filters: list[tuple] | None = None,
+                         optimize: bool = False) -> pd.DataFrame:
+    """Read a whole CSV/Parquet file; with `optimize`, low-cardinality strings are read directly as categories."""
     suffix = path.suffix.lower()
+    usecols = needed_columns(columns, filters)
     if suffix == '.csv':
         # Try to sniff delimiter & encoding
         try:
-            import csv, chardet
-            raw = path.read_bytes()
-            enc_guess = (chardet.detect(raw).get('encoding') or 'utf-8')
-            try:
-                sample = raw[:100000].decode(enc_guess, errors='ignore')
-            except Exception:
-                enc_guess = 'utf-8'
-                sample = raw[:100000].decode(enc_guess, errors='ignore')
-            sniffer = csv.Sniffer()
-            try:
-                dialect = sniffer.sniff(sample)
-                sep = dialect.delimiter
-            except Exception:
-                sep = ','
-            print(f"[INFO] Reading CSV: {path} (encoding={enc_guess}, sep='{sep}')")
-            return pd.read_csv(path, encoding=enc_guess, sep=sep)
+            enc_guess, sep = sniff_csv(path)
+            if columns or filters:
+                check_columns(read_csv_header(path, enc_guess, sep), columns, filters)
+            with phase('read'):
+                dtype = csv_read_dtypes(path, enc_guess, sep, usecols) if optimize else None
+                if dtype:
+                    print(f"[INFO] Reading as category: {', '.join(dtype)}")
+                print(f"[INFO] Reading CSV: {path} (encoding={enc_guess}, sep='{sep}')")
+                df = pd.read_csv(path, encoding=enc_guess, sep=sep, usecols=usecols, dtype=dtype)
         except Exception as e:
             print(f"[WARN] Sniff failed, falling back to default read_csv: {e}")
-            return pd.read_csv(path)
+            with phase('read'):
+                df = pd.read_csv(path, usecols=usecols)
+        return apply_filters(df, filters, columns).reset_index(drop=True)
     elif suffix == '.parquet':
-        print(f"[INFO] Reading Parquet: {path}")
-        return pd.read_parquet(path)
+        import pyarrow.parquet as pq
+        if columns or filters:
+            check_columns(pq.read_schema(path).names, columns, filters)
+        print(f"[INFO] Reading Parquet: {path}" + (f" (columns={len(columns)})" if columns else ''))
+        read_dictionary = parquet_dictionary_columns(path, usecols) if optimize else None
+        if read_dictionary:
+            print(f"[INFO] Reading as category: {', '.join(read_dictionary)}")
+        with phase('read'):
+            table = pq.read_table(path, columns=columns, filters=filters, memory_map=True, read_dictionary=read_dictionary)
+            return table.to_pandas()
     else:
         print(f"[ERROR] Unsupported file extension: {suffix}", file=sys.stderr)
         sys.exit(4)
 
 
-def build_sql(limit: int | None) -> str:
-    if not DEFAULT_SQL_FILE.exists():
-        print(f"[ERROR] SQL file not found: {DEFAULT_SQL_FILE.resolve()}", file=sys.stderr)
+def iter_local_chunks(path: Path, chunksize: int, columns: list[str] | None = None, filters: list[tuple] | None = None):
+    """Yield DataFrames of at most `chunksize` rows; never holds the whole file in memory."""
+    suffix = path.suffix.lower()
+    usecols = needed_columns(columns, filters)
+    if suffix == '.csv':
+        try:
+            enc_guess, sep = sniff_csv(path)
+        except Exception as e:
+            print(f"[WARN] Sniff failed, falling back to defaults: {e}")
+            enc_guess, sep = 'utf-8', ','
+        if columns or filters:
+            check_columns(read_csv_header(path, enc_guess, sep), columns, filters)
+        print(f"[INFO] Streaming CSV: {path} (encoding={enc_guess}, sep='{sep}', chunksize={chunksize:,})")
+        with pd.read_csv(path, encoding=enc_guess, sep=sep, chunksize=chunksize, usecols=usecols) as reader:
+            for chunk in timed_iter(reader, 'read'):
+                yield apply_filters(chunk, filters, columns)
+    elif suffix == '.parquet':
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(path, memory_map=True)
+        names = pf.schema_arrow.names
+        if columns or filters:
+            check_columns(names, columns, filters)
+        row_groups = list(range(pf.num_row_groups))
+        if filters:
+            row_groups = [i for i in row_groups if row_group_may_match(pf.metadata.row_group(i), pf.metadata.schema.names, filters)]
+        print(f"[INFO] Streaming Parquet: {path} (batch size={chunksize:,}, row groups {len(row_groups)}/{pf.num_row_groups})")
+        if not row_groups:
+            return
+        batches = (b.to_pandas() for b in pf.iter_batches(batch_size=chunksize, row_groups=row_groups, columns=usecols))
+        for chunk in timed_iter(batches, 'read'):
+            yield apply_filters(chunk, filters, columns)
+    else:
+        print(f"[ERROR] Unsupported file extension: {suffix}", file=sys.stderr)
+        sys.exit(4)
+
+
+def sql_dialect() -> str:
+    load_dotenv()
+    return 'duckdb' if os.getenv('SNOWFLAKE_STANDIN') else 'snowflake'
+
+
+def build_sql(limit: int | None, sample: int | None = None, sample_pct: float | None = None,
+              seed: int = SAMPLE_SEED, dialect: str = 'snowflake', where: str | None = None,
+              sql_file: Path = DEFAULT_SQL_FILE) -> str:
+    if not sql_file.exists():
+        print(f"[ERROR] SQL file not found: {sql_file.resolve()}", file=sys.stderr)
         sys.exit(5)
-    sql = DEFAULT_SQL_FILE.read_text(encoding='utf-8').strip()
+    sql = sql_file.read_text(encoding='utf-8').strip().rstrip(';').strip()
     if not sql:
-        print(f"[ERROR] SQL file is empty: {DEFAULT_SQL_FILE.resolve()}", file=sys.stderr)
+        print(f"[ERROR] SQL file is empty: {sql_file.resolve()}", file=sys.stderr)
         sys.exit(5)
-    if limit is not None:
+    if where:
+        sql = f"SELECT * FROM ({sql}) AS base WHERE {where}"
+    clause = None
+    if sample_pct:
+        clause = SAMPLE_CLAUSES[dialect]['pct'].format(pct=sample_pct, seed=seed)
+    elif sample:
+        clause = SAMPLE_CLAUSES[dialect]['rows'].format(n=sample, seed=seed)
+
+    if clause and limit is not None:
+        # LIMIT first, then sample – same order as fetching and sampling client-side
+        sql = f"WITH src AS ({sql}), limited AS (SELECT * FROM src LIMIT {limit}) SELECT * FROM limited {clause}"
+    elif clause:
+        sql = f"WITH src AS ({sql}) SELECT * FROM src {clause}"
+    elif limit is not None:
         sql = f"WITH src AS ({sql}) SELECT * FROM src LIMIT {limit}"
     return sql
 
@@ -150,6 +458,12 @@ def build_sql(limit: int | None) -> str:
 def get_snowflake_connection():
     load_dotenv()  # loads .env
 
+    standin = os.getenv('SNOWFLAKE_STANDIN')
+    if standin:
+        import local_connector
+        print(f'[INFO] Using local DuckDB stand-in instead of Snowflake: {standin}')
+        return local_connector.connect(standin)
+
     required = {
         'SNOWFLAKE_ACCOUNT': os.getenv('SNOWFLAKE_ACCOUNT'),
         'SNOWFLAKE_USER': os.getenv('SNOWFLAKE_USER'),
@@ -180,57 +494,755 @@ def get_snowflake_connection():
     )
 
 
-def fetch_df_snowflake(sql: str) -> pd.DataFrame:
+def download_batches(batches: list, workers: int):
+    """
+    Download Snowflake result batches in parallel, yielding DataFrames in order.
+    At most 2 × workers batches are in flight, so memory stays bounded.
+    """
+    workers = max(1, workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        it = iter(batches)
+        pending = deque(pool.submit(b.to_pandas) for _, b in zip(range(2 * workers), it))
+        while pending:
+            df = pending.popleft().result()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append(pool.submit(nxt.to_pandas))
+            yield df
+
+
+def connect_snowflake():
     print('[INFO] Connecting to Snowflake…')
-    conn = get_snowflake_connection()
-    cur = conn.cursor()
+    with phase('connect'):
+        return get_snowflake_connection()
+
+
+SNOWFLAKE_POOL: ConnectionPool | None = None
+
+
+def open_snowflake_pool(size: int) -> ConnectionPool:
+    global SNOWFLAKE_POOL
+    close_snowflake_pool()
+    SNOWFLAKE_POOL = ConnectionPool(connect_snowflake, size)
+    return SNOWFLAKE_POOL
+
+
+def snowflake_pool() -> ConnectionPool:
+    """The connection pool of this run; every query borrows from it instead of logging in again."""
+    return SNOWFLAKE_POOL or open_snowflake_pool(1)
+
+
+def close_snowflake_pool():
+    global SNOWFLAKE_POOL
+    if SNOWFLAKE_POOL is not None:
+        SNOWFLAKE_POOL.close()
+        SNOWFLAKE_POOL = None
+
+
+def iter_snowflake_batches(sql: str, workers: int = 4, label: str = DEFAULT_SQL_FILE.name):
+    """Run `sql` and yield the result as a stream of DataFrames (one per result batch)."""
+    with snowflake_pool().connection() as conn:
+        cur = conn.cursor()
+        try:
+            print(f'[INFO] Running query from {label}…')
+            with phase('query'):
+                cur.execute(sql)
+                batches = cur.get_result_batches() or []
+            print(f'[INFO] Downloading {len(batches)} result batches for {label} ({workers} workers)…')
+            for df in timed_iter(download_batches(batches, workers), 'fetch'):
+                if len(df):
+                    yield df
+        finally:
+            cur.close()
+
+
+def tee_to_parquet(chunks, path: Path):
+    """Yield each DataFrame from `chunks` while appending it to one Parquet file at `path`."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer = None
     try:
-        print('[INFO] Running query from ./query.sql…')
-        cur.execute(sql)
-        df = cur.fetch_pandas_all()
+        for df in chunks:
+            with phase('spill'):
+                if writer is None:
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                    writer = pq.ParquetWriter(path, table.schema)
+                else:
+                    table = pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False)
+                writer.write_table(table)
+            yield df
     finally:
-        cur.close()
-        conn.close()
-    return df
+        if writer is not None:
+            writer.close()
 
 
-def maybe_sample(df: pd.DataFrame, n: int | None) -> pd.DataFrame:
-    if n is None or n <= 0 or n >= len(df):
-        return df
-    print(f'[INFO] Sampling {n} rows from {len(df)}…')
-    return df.sample(n=n, random_state=42).reset_index(drop=True)
+def spill_to_parquet(chunks, path: Path) -> int:
+    """Write a stream of DataFrames to one Parquet file; returns the row count."""
+    return sum(len(df) for df in tee_to_parquet(chunks, path))
 
 
-def main():
-    ensure_dirs()
-    args = parse_args()
+def snowflake_context() -> dict:
+    """Connection settings that change what query.sql resolves to; part of the cache key."""
+    load_dotenv()
+    return {k: os.getenv(k) for k in (
+        'SNOWFLAKE_STANDIN', 'SNOWFLAKE_ACCOUNT', 'SNOWFLAKE_DATABASE', 'SNOWFLAKE_SCHEMA', 'SNOWFLAKE_ROLE')}
 
-    # Acquire DataFrame
-    if args.mode == 'local':
-        input_path = find_local_file(args.input)
-        df = read_local_dataframe(input_path)
-    else:  # snowflake
-        sql = build_sql(args.limit)
-        df = fetch_df_snowflake(sql)
 
+def open_result_cache(args: argparse.Namespace) -> ResultCache | None:
+    if args.no_cache:
+        return None
+    return ResultCache(CACHE_DIR, ttl_seconds=args.cache_ttl * 3600, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+
+
+def fetch_into_cache(sql: str, args: argparse.Namespace, cache: ResultCache, key: str, label: str = DEFAULT_SQL_FILE.name):
+    """Yield live result batches while writing them to the cache; the entry is committed only if complete."""
+    rows = 0
+    try:
+        for df in tee_to_parquet(iter_snowflake_batches(sql, args.fetch_workers, label), cache.pending_path(key)):
+            rows += len(df)
+            yield df
+    except BaseException:
+        cache.discard(key)
+        raise
+    if rows:
+        cache.commit(key, sql)
+        print(f'[INFO] Cached {rows:,} rows as {key[:12]}…')
+    else:
+        cache.discard(key)
+
+
+def cached_lookup(sql: str, args: argparse.Namespace, cache: ResultCache) -> tuple[str, Path | None]:
+    key = cache_key(sql, snowflake_context())
+    path = None if args.refresh else cache.lookup(key)
+    if path is not None:
+        print(f'[INFO] Using cached result {key[:12]}… (use --refresh to re-run the query)')
+    return key, path
+
+
+def cached_snowflake_chunks(sql: str, args: argparse.Namespace, cache: ResultCache, label: str = DEFAULT_SQL_FILE.name):
+    """Yield the result of `sql` as DataFrames, served from the cache when possible."""
+    key, path = cached_lookup(sql, args, cache)
+    if path is not None:
+        yield from iter_local_chunks(path, args.chunksize)
+    else:
+        yield from fetch_into_cache(sql, args, cache, key, label)
+
+
+def cached_snowflake_path(sql: str, args: argparse.Namespace, cache: ResultCache, label: str = DEFAULT_SQL_FILE.name) -> Path | None:
+    """Return a Parquet file holding the result of `sql`, running the query only on a cache miss."""
+    key, path = cached_lookup(sql, args, cache)
+    if path is None:
+        for _ in fetch_into_cache(sql, args, cache, key, label):
+            pass
+        path = cache.path(key) if cache.path(key).exists() else None
+    return path
+
+
+def fetch_df_snowflake(sql: str, workers: int = 4, spill_path: Path | None = None, optimize: bool = False,
+                       label: str = DEFAULT_SQL_FILE.name) -> pd.DataFrame:
+    chunks = iter_snowflake_batches(sql, workers, label)
+    if spill_path is not None:
+        rows = spill_to_parquet(chunks, spill_path)
+        if rows == 0:
+            return pd.DataFrame()
+        print(f'[INFO] Spilled {rows:,} rows to {spill_path}')
+        return read_local_dataframe(spill_path, optimize=optimize)
+    frames = list(chunks)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def reservoir_sample(chunks, n: int, seed: int = SAMPLE_SEED) -> pd.DataFrame:
+    """
+    Uniform sample of `n` rows in one pass over `chunks`, holding at most n + chunksize rows.
+    Every row gets a key from a seeded RNG and the n smallest keys are kept, so the result
+    depends only on the seed and the row order, not on the chunk size.
+    """
+    rng = np.random.default_rng(seed)
+    kept, kept_keys, seen = None, None, 0
+    for chunk in chunks:
+        with phase('sample'):
+            chunk = chunk.set_axis(pd.RangeIndex(seen, seen + len(chunk)))
+            keys = rng.random(len(chunk))
+            seen += len(chunk)
+            if kept is not None:
+                chunk = pd.concat([kept, chunk])
+                keys = np.concatenate([kept_keys, keys])
+            if len(chunk) > n:
+                idx = np.argpartition(keys, n)[:n]
+                chunk, keys = chunk.iloc[idx], keys[idx]
+            kept, kept_keys = chunk, keys
+    if kept is None:
+        return pd.DataFrame()
+    print(f'[INFO] Sampled {len(kept):,} of {seen:,} rows (seed={seed}).')
+    return kept.sort_index().reset_index(drop=True)
+
+
+def bernoulli_sample(chunks, pct: float, seed: int = SAMPLE_SEED):
+    """Keep each row with probability pct/100; streams chunk by chunk."""
+    rng = np.random.default_rng(seed)
+    for chunk in chunks:
+        with phase('sample'):
+            chunk = chunk[rng.random(len(chunk)) < pct / 100.0]
+        yield chunk
+
+
+def sampling_requested(args: argparse.Namespace) -> bool:
+    return bool(args.sample_pct) or bool(args.sample and args.sample > 0)
+
+
+def sample_chunks(chunks, args: argparse.Namespace):
+    if args.sample_pct:
+        yield from bernoulli_sample(chunks, args.sample_pct, args.sample_seed)
+    elif args.sample and args.sample > 0:
+        df = reservoir_sample(chunks, args.sample, args.sample_seed)
+        if len(df):
+            yield df
+    else:
+        yield from chunks
+
+
+def collect(chunks) -> pd.DataFrame:
+    frames = [c for c in chunks if len(c)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def cached_full_result(args: argparse.Namespace, cache: ResultCache | None, sql_file: Path = DEFAULT_SQL_FILE) -> Path | None:
+    """
+    A cached unsampled result for the same query can be sampled locally instead of re-querying.
+    The seeded local sample is repeatable but selects different rows than the warehouse SAMPLE clause.
+    """
+    if cache is None or args.refresh or not sampling_requested(args):
+        return None
+    return cached_lookup(build_sql(args.limit, sql_file=sql_file), args, cache)[1]
+
+
+def snowflake_sql(args: argparse.Namespace, sql_file: Path = DEFAULT_SQL_FILE) -> str:
+    return build_sql(args.limit, args.sample, args.sample_pct, args.sample_seed, sql_dialect(), sql_file=sql_file)
+
+
+def local_chunks(input_path: Path, args: argparse.Namespace):
+    chunks = iter_local_chunks(input_path, args.chunksize, parse_columns(args.columns), parse_filters(args.filter))
+    return sample_chunks(chunks, args)
+
+
+def snowflake_chunks(args: argparse.Namespace, sql_file: Path = DEFAULT_SQL_FILE):
+    cache = open_result_cache(args)
+    full = cached_full_result(args, cache, sql_file)
+    if full is not None:
+        return sample_chunks(iter_local_chunks(full, args.chunksize), args)
+    if cache is not None:
+        return cached_snowflake_chunks(snowflake_sql(args, sql_file), args, cache, sql_file.name)
+    return iter_snowflake_batches(snowflake_sql(args, sql_file), args.fetch_workers, sql_file.name)
+
+
+def load_local(input_path: Path, args: argparse.Namespace) -> pd.DataFrame:
+    columns, filters = parse_columns(args.columns), parse_filters(args.filter)
+    if sampling_requested(args):
+        return collect(local_chunks(input_path, args))
+    return read_local_dataframe(input_path, columns, filters, optimize=not args.no_optimize)
+
+
+def load_snowflake(args: argparse.Namespace, out_path: Path, sql_file: Path = DEFAULT_SQL_FILE) -> pd.DataFrame:
+    cache = open_result_cache(args)
+    full = cached_full_result(args, cache, sql_file)
+    if full is not None:
+        return collect(sample_chunks(iter_local_chunks(full, args.chunksize), args))
+    sql = snowflake_sql(args, sql_file)
+    if cache is not None:
+        # The cache entry doubles as a Parquet spill file, so batches never pile up in memory
+        path = cached_snowflake_path(sql, args, cache, sql_file.name)
+        return read_local_dataframe(path, optimize=not args.no_optimize) if path is not None else pd.DataFrame()
+    spill_path = SPILL_DIR / out_path.with_suffix('.parquet').name if args.spill else None
+    return fetch_df_snowflake(sql, args.fetch_workers, spill_path, optimize=not args.no_optimize, label=sql_file.name)
+
+
+def accumulate(chunks, progress: bool = True) -> ProfileAccumulator:
+    acc = ProfileAccumulator()
+    for chunk in timed_iter(chunks, 'load'):
+        with phase('analyze'):
+            acc.update(chunk)
+        if progress:
+            print(f'[INFO] Profiled {acc.rows:,} rows…', end='\r', flush=True)
+    if progress:
+        print()
+    return acc
+
+
+def run_streaming(chunks, source: str, out_path: Path, args: argparse.Namespace) -> dict:
+    if args.target:
+        print('[WARN] --target is ignored by the streaming engine.')
+    return write_streaming_report(accumulate(chunks), source, out_path)
+
+
+def write_streaming_report(acc: ProfileAccumulator, source: str, out_path: Path) -> dict:
+    if acc.rows == 0:
+        print('[ERROR] No data returned.', file=sys.stderr)
+        sys.exit(3)
+
+    print(f'[INFO] Profiled {acc.rows:,} rows × {len(acc.columns)} columns in {acc.chunks} chunks.')
+    with phase('render'):
+        json_path = write_report(acc.to_profile(source), out_path)
+    print(f'[INFO] Done. Wrote report to: {out_path.resolve()} (stats: {json_path.name})')
+    return {'rows': acc.rows, 'columns': len(acc.columns)}
+
+
+def profile_df(df: pd.DataFrame, source: str, out_path: Path, args: argparse.Namespace) -> dict:
     if df.empty:
         print('[ERROR] No data returned.', file=sys.stderr)
         sys.exit(3)
 
     print(f'[INFO] Loaded {len(df):,} rows × {len(df.columns)} columns.')
-    df = maybe_sample(df, args.sample)
+    if not args.no_optimize:
+        with phase('optimize'):
+            df = optimize_dtypes(df)
+
+    summary = {'rows': len(df), 'columns': len(df.columns)}
+    target = args.target if args.target and args.target in df.columns else None
+
+    if args.engine == 'fast':
+        print('[INFO] Generating fast profile…')
+        with phase('analyze'):
+            profile = profile_dataframe(df, source, target=target)
+        with phase('render'):
+            json_path = write_report(profile, out_path)
+        print(f'[INFO] Done. Wrote report to: {out_path.resolve()} (stats: {json_path.name})')
+        return summary
 
     # Generate Sweetviz report
     print('[INFO] Generating Sweetviz report…')
-    if args.target and args.target in df.columns:
-        report = sv.analyze(df, target_feat=args.target)
-    else:
-        report = sv.analyze(df)
+    with phase('analyze'):
+        if target:
+            report = sv.analyze(df, target_feat=target)
+        else:
+            report = sv.analyze(df)
 
-    out_path = resolve_output_path(args.output_name)
     # Avoid auto-opening browser in WSL
-    report.show_html(str(out_path), open_browser=False)
+    with phase('render'):
+        report.show_html(str(out_path), open_browser=False)
     print(f'[INFO] Done. Wrote report to: {out_path.resolve()}')
+    return summary
+
+
+def profile_local_file(input_path: Path, args: argparse.Namespace, out_path: Path) -> dict:
+    if args.engine == 'streaming':
+        return run_streaming(local_chunks(input_path, args), str(input_path), out_path, args)
+    with phase('load'):
+        df = load_local(input_path, args)
+    return profile_df(df, str(input_path), out_path, args)
+
+
+def batch_signature(path: Path, args: argparse.Namespace) -> dict:
+    """What a report depends on; a file is re-profiled only when this changes."""
+    st = path.stat()
+    options = {k: getattr(args, k) for k in (
+        'engine', 'target', 'sample', 'sample_pct', 'sample_seed', 'columns', 'filter', 'no_optimize')}
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'options': options}
+
+
+def batch_worker(input_path: str, out_path: str, args: argparse.Namespace) -> dict:
+    start = time.perf_counter()
+    if args.metrics:
+        # Worker processes are reused (and may be forked from this one); report only this file's phases
+        METRICS.restart()
+    try:
+        summary = profile_local_file(Path(input_path), args, Path(out_path))
+        result = {'status': 'ok', **summary, 'seconds': round(time.perf_counter() - start, 2)}
+    except SystemExit as e:
+        result = {'status': 'error', 'error': f'exit code {e.code}'}
+    except Exception as e:
+        result = {'status': 'error', 'error': f'{type(e).__name__}: {e}'}
+    if args.metrics:
+        result['phases'] = METRICS.phases
+    return result
+
+
+def run_batch(args: argparse.Namespace):
+    files = find_local_files()
+    if not files:
+        print(f'[ERROR] No CSV or Parquet files found in {INPUT_DIR.resolve()}.', file=sys.stderr)
+        sys.exit(4)
+    if args.input or args.output_name:
+        print('[WARN] --input/--output-name are ignored with --all; reports are named after each input file.')
+
+    try:
+        state = json.loads(BATCH_STATE_FILE.read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        state = {}
+    state = {k: v for k, v in state.items() if Path(k) in files}
+
+    todo = []
+    for path in files:
+        out_path = OUTPUT_DIR / f'{path.name}.html'
+        signature = batch_signature(path, args)
+        prev = state.get(str(path))
+        if prev and prev.get('signature') == signature and prev.get('status') == 'ok' and out_path.exists():
+            print(f'[INFO] Unchanged, skipping: {path.name}')
+            continue
+        todo.append((path, out_path, signature))
+
+    print(f'[INFO] Profiling {len(todo)} of {len(files)} files with {args.workers} workers…')
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {pool.submit(batch_worker, str(path), str(out_path), args): (path, out_path, sig) for path, out_path, sig in todo}
+        for future in as_completed(futures):
+            path, out_path, signature = futures[future]
+            result = future.result()
+            METRICS.merge(result.pop('phases', {}))
+            state[str(path)] = {
+                'signature': signature,
+                'report': out_path.name,
+                'profiled_at': datetime.now().isoformat(timespec='seconds'),
+                **result,
+            }
+            if result['status'] == 'ok':
+                print(f"[INFO] ✔ {path.name}: {result['rows']:,} rows in {result['seconds']}s")
+            else:
+                print(f"[WARN] ✘ {path.name}: {result['error']}", file=sys.stderr)
+
+    BATCH_STATE_FILE.write_text(json.dumps(state, indent=2), encoding='utf-8')
+    entries = [{'file': Path(k).name, **v} for k, v in sorted(state.items())]
+    index_path = OUTPUT_DIR / 'index.html'
+    index_path.write_text(render_index(entries), encoding='utf-8')
+    failed = sum(1 for e in entries if e['status'] != 'ok')
+    print(f'[INFO] Done. {len(todo)} profiled, {len(files) - len(todo)} unchanged, {failed} failed. Index: {index_path.resolve()}')
+    return {'files': len(files), 'profiled': len(todo), 'failed': failed}
+
+
+def incremental_state_path(out_path: Path) -> Path:
+    return out_path.with_suffix('.state.json.gz')
+
+
+def incremental_options(args: argparse.Namespace) -> dict:
+    """Options the saved sketches depend on; if any of them change the profile is rebuilt."""
+    return {k: getattr(args, k) for k in ('mode', 'columns', 'filter', 'sample_pct', 'sample_seed', 'limit', 'watermark_column')}
+
+
+def load_incremental_state(path: Path, args: argparse.Namespace) -> dict | None:
+    if args.refresh:
+        print('[INFO] --refresh: rebuilding the incremental profile from scratch.')
+        return None
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        print(f'[WARN] Ignoring unreadable state file {path.name} ({e}); rebuilding.')
+        return None
+    if state.get('options') != incremental_options(args):
+        print('[WARN] Profiling options changed since the saved state was written; rebuilding from scratch.')
+        return None
+    return state
+
+
+def save_incremental_state(path: Path, state: dict):
+    tmp = path.with_suffix('.tmp')
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+        json.dump(state, f, default=str)
+    tmp.replace(path)
+
+
+def file_signature(path: Path) -> dict:
+    st = path.stat()
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def write_incremental_report(acc: ProfileAccumulator, source: str, out_path: Path, state: dict) -> dict:
+    if acc.rows == 0:
+        print('[ERROR] No data returned.', file=sys.stderr)
+        sys.exit(3)
+    state.update({'updated_at': datetime.now().isoformat(timespec='seconds'), 'profile': acc.to_state()})
+    state_path = incremental_state_path(out_path)
+    with phase('save_state'):
+        save_incremental_state(state_path, state)
+    with phase('render'):
+        json_path = write_report(acc.to_profile(source), out_path)
+    print(f'[INFO] Profile now covers {acc.rows:,} rows × {len(acc.columns)} columns.')
+    print(f'[INFO] Done. Wrote report to: {out_path.resolve()} (stats: {json_path.name}, state: {state_path.name})')
+    return {'rows': acc.rows, 'columns': len(acc.columns)}
+
+
+def run_incremental_local(args: argparse.Namespace, out_path: Path) -> dict:
+    root = Path(args.input).resolve() if args.input else INPUT_DIR
+    if not root.exists():
+        print(f'[ERROR] Not found: {root}', file=sys.stderr)
+        sys.exit(4)
+    files = find_partition_files(root)
+    if not files:
+        print(f'[ERROR] No CSV or Parquet files found under {root}.', file=sys.stderr)
+        sys.exit(4)
+
+    state_path = incremental_state_path(out_path)
+    with phase('load_state'):
+        state = load_incremental_state(state_path, args)
+    if state is not None:
+        seen = state['files']
+        changed = [k for k, sig in seen.items() if not Path(k).exists() or file_signature(Path(k)) != sig]
+        if changed:
+            # Sketches can only absorb data, not forget it, so edits or deletions mean starting over
+            print(f'[WARN] {len(changed)} previously profiled file(s) changed or were removed '
+                  f'(e.g. {Path(changed[0]).name}); rebuilding from scratch.')
+            state = None
+    if state is None:
+        state = {'options': incremental_options(args), 'files': {}}
+        acc = ProfileAccumulator()
+    else:
+        with phase('load_state'):
+            acc = ProfileAccumulator.from_state(state['profile'])
+
+    new_files = [p for p in files if str(p) not in state['files']]
+    print(f'[INFO] {len(new_files)} new of {len(files)} files; {acc.rows:,} rows already profiled.')
+    for path in new_files:
+        part = ProfileAccumulator()
+        for chunk in timed_iter(local_chunks(path, args), 'load'):
+            with phase('analyze'):
+                part.update(chunk)
+        with phase('merge'):
+            acc.merge(part)
+        state['files'][str(path)] = file_signature(path)
+        print(f'[INFO] ✔ {path.relative_to(root) if path != root else path.name}: {part.rows:,} rows')
+    return write_incremental_report(acc, str(root), out_path, state)
+
+
+def sql_literal(value) -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def run_incremental_snowflake(args: argparse.Namespace, out_path: Path, sql_file: Path = DEFAULT_SQL_FILE) -> dict:
+    column = args.watermark_column
+    if not column:
+        print('[ERROR] --incremental in snowflake mode needs --watermark-column.', file=sys.stderr)
+        sys.exit(2)
+
+    with phase('load_state'):
+        state = load_incremental_state(incremental_state_path(out_path), args)
+    if state is None:
+        state = {'options': incremental_options(args), 'watermark': None}
+        acc = ProfileAccumulator()
+    else:
+        with phase('load_state'):
+            acc = ProfileAccumulator.from_state(state['profile'])
+
+    where = f'{column} > {sql_literal(state["watermark"])}' if state['watermark'] is not None else None
+    sql = build_sql(args.limit, sample_pct=args.sample_pct, seed=args.sample_seed, dialect=sql_dialect(), where=where, sql_file=sql_file)
+    print(f'[INFO] Fetching rows with {column} > {state["watermark"]}…' if where else '[INFO] No saved state; fetching all rows…')
+    # Deltas differ on every run, so they bypass the result cache
+    part = ProfileAccumulator()
+    for chunk in timed_iter(iter_snowflake_batches(sql, args.fetch_workers, sql_file.name), 'load'):
+        with phase('analyze'):
+            part.update(chunk)
+    print(f'[INFO] {part.rows:,} new rows; {acc.rows:,} rows already profiled.')
+    with phase('merge'):
+        acc.merge(part)
+
+    mark = acc.columns.get(column) or acc.columns.get(column.upper()) or acc.columns.get(column.lower())
+    if acc.rows and (mark is None or mark.kind not in ('numeric', 'datetime')):
+        print(f'[ERROR] Watermark column {column} must be a numeric or timestamp column of the result.', file=sys.stderr)
+        sys.exit(2)
+    if mark is not None and mark.max is not None:
+        state['watermark'] = to_python(mark.max)
+    return write_incremental_report(acc, str(sql_file), out_path, state)
+
+
+def run_incremental(args: argparse.Namespace, sql_file: Path = DEFAULT_SQL_FILE) -> dict:
+    if args.sample:
+        print('[ERROR] --sample cannot be combined with --incremental; use --sample-pct.', file=sys.stderr)
+        sys.exit(2)
+    if args.engine != 'streaming':
+        print('[INFO] --incremental profiles with the streaming engine.')
+    if args.target:
+        print('[WARN] --target is ignored with --incremental.')
+    if args.output_name:
+        out_path = resolve_output_path(args.output_name)
+    else:
+        # A stable name, so the next run finds the saved state
+        stem = Path(args.input).stem if args.mode == 'local' and args.input else (INPUT_DIR.name if args.mode == 'local' else sql_file.stem)
+        out_path = OUTPUT_DIR / f'incremental_{stem}.html'
+    if args.mode == 'local':
+        return run_incremental_local(args, out_path)
+    return run_incremental_snowflake(args, out_path, sql_file)
+
+
+def pushdown_profile(args: argparse.Namespace, sql_file: Path = DEFAULT_SQL_FILE) -> dict:
+    """Profile the result of `sql_file` with one aggregate query in the warehouse."""
+    dialect = DIALECTS[sql_dialect()]
+    sql = snowflake_sql(args, sql_file)
+    with snowflake_pool().connection() as conn:
+        cur = conn.cursor()
+        try:
+            with phase('describe'):
+                cur.execute(describe_sql(sql))
+                columns = column_kinds(cur.description, dialect)
+            agg_sql, slots = aggregate_sql(sql, columns, dialect)
+            print(f'[INFO] Running aggregate query for {sql_file.name}: {len(columns)} columns ({len(slots)} statistics) in the warehouse…')
+            with phase('query'):
+                cur.execute(agg_sql)
+                row = cur.fetchall()[0]
+        finally:
+            cur.close()
+    return build_profile(row, slots, columns, dialect, str(sql_file))
+
+
+def write_pushdown_report(profile: dict, out_path: Path) -> dict:
+    if profile['rows'] == 0:
+        print('[ERROR] No data returned.', file=sys.stderr)
+        sys.exit(3)
+    print(f"[INFO] Profiled {profile['rows']:,} rows × {profile['n_columns']} columns without fetching them.")
+    with phase('render'):
+        json_path = write_report(profile, out_path)
+    print(f'[INFO] Done. Wrote report to: {out_path.resolve()} (stats: {json_path.name})')
+    return {'rows': profile['rows'], 'columns': profile['n_columns']}
+
+
+def find_sql_files(paths: list[str]) -> list[Path]:
+    """SQL files named on the command line, plus every *.sql directly inside named directories."""
+    files = []
+    for raw in paths:
+        p = Path(raw)
+        if p.is_dir():
+            files += sorted(p.glob('*.sql'))
+        elif p.exists():
+            files.append(p)
+        else:
+            print(f'[ERROR] SQL file not found: {p}', file=sys.stderr)
+            sys.exit(5)
+    files = list(dict.fromkeys(f.resolve() for f in files))
+    if not files:
+        print(f"[ERROR] No .sql files found in: {', '.join(paths)}", file=sys.stderr)
+        sys.exit(5)
+    return files
+
+
+def fetch_query(sql_file: Path, args: argparse.Namespace, out_path: Path, progress: bool = True) -> tuple[str, object]:
+    """
+    Run one query in the form its engine needs: a pushdown profile, filled streaming
+    accumulators, or a DataFrame. Returned as (kind, payload) for report_query().
+    """
+    if args.pushdown:
+        return 'pushdown', pushdown_profile(args, sql_file)
+    if args.engine == 'streaming':
+        # result batches go straight into the accumulators
+        return 'streaming', accumulate(snowflake_chunks(args, sql_file), progress)
+    with phase('load'):
+        return 'frame', load_snowflake(args, out_path, sql_file)
+
+
+def report_query(kind: str, payload, sql_file: Path, out_path: Path, args: argparse.Namespace) -> dict:
+    if kind == 'pushdown':
+        return write_pushdown_report(payload, out_path)
+    if kind == 'streaming':
+        return write_streaming_report(payload, str(sql_file), out_path)
+    return profile_df(payload, str(sql_file), out_path, args)
+
+
+def query_job(sql_file: Path, args: argparse.Namespace, out_path: Path) -> tuple[str, object]:
+    """Thread-pool wrapper around fetch_query; failures are returned, not raised, so one query can't stop the rest."""
+    try:
+        return fetch_query(sql_file, args, out_path, progress=False)
+    except SystemExit as e:
+        return 'error', f'exit code {e.code}'
+    except Exception as e:
+        return 'error', f'{type(e).__name__}: {e}'
+
+
+def run_queries(args: argparse.Namespace, sql_files: list[Path]) -> dict:
+    """Run several SQL files concurrently over the connection pool and profile each result as it arrives."""
+    prefix = f'{Path(args.output_name).stem}_' if args.output_name else ''
+    workers = snowflake_pool().size
+    print(f'[INFO] Running {len(sql_files)} queries, {workers} at a time…')
+    rows, failed = 0, []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='query') as pool:
+        futures = {}
+        for sql_file in sql_files:
+            out_path = OUTPUT_DIR / f'{prefix}{sql_file.stem}.html'
+            futures[pool.submit(query_job, sql_file, args, out_path)] = (sql_file, out_path)
+        # Profiling happens here on the main thread (Sweetviz is not thread-safe) while other queries are still fetching
+        for future in as_completed(futures):
+            sql_file, out_path = futures[future]
+            kind, payload = future.result()
+            try:
+                if kind == 'error':
+                    raise RuntimeError(payload)
+                print(f'[INFO] ✔ {sql_file.name}: result ready, profiling…')
+                rows += report_query(kind, payload, sql_file, out_path, args)['rows']
+            except (SystemExit, Exception) as e:
+                error = f'exit code {e.code}' if isinstance(e, SystemExit) else str(e)
+                failed.append(sql_file.name)
+                print(f'[WARN] ✘ {sql_file.name}: {error}', file=sys.stderr)
+    print(f'[INFO] Done. {len(sql_files) - len(failed)} of {len(sql_files)} queries profiled '
+          f'using {snowflake_pool().opened} connection(s).' + (f" Failed: {', '.join(failed)}" if failed else ''))
+    return {'queries': len(sql_files), 'failed': len(failed), 'rows': rows}
+
+
+def run(args: argparse.Namespace) -> dict:
+    if args.all:
+        if args.incremental:
+            print('[ERROR] --all and --incremental cannot be combined.', file=sys.stderr)
+            sys.exit(2)
+        if args.mode != 'local':
+            print('[ERROR] --all is only supported with --mode local.', file=sys.stderr)
+            sys.exit(2)
+        return run_batch(args)
+    if args.pushdown and (args.mode != 'snowflake' or args.incremental):
+        print('[ERROR] --pushdown is only supported with --mode snowflake (and not with --incremental).', file=sys.stderr)
+        sys.exit(2)
+
+    if args.mode == 'local':
+        if args.sql:
+            print('[WARN] --sql applies to snowflake mode only.')
+        if args.incremental:
+            return run_incremental(args)
+        return profile_local_file(find_local_file(args.input), args, resolve_output_path(args.output_name))
+
+    if args.columns or args.filter:
+        print('[WARN] --columns/--filter apply to local mode only; narrow columns and rows in the SQL instead.')
+    if args.target and (args.pushdown or args.engine == 'streaming'):
+        print('[WARN] --target is ignored with --pushdown and the streaming engine.')
+    sql_files = find_sql_files(args.sql) if args.sql else [DEFAULT_SQL_FILE]
+    open_snowflake_pool(min(args.max_connections, len(sql_files)))
+    if len(sql_files) > 1:
+        if args.incremental:
+            print('[ERROR] --incremental takes a single SQL file.', file=sys.stderr)
+            sys.exit(2)
+        return run_queries(args, sql_files)
+    if args.incremental:
+        return run_incremental(args, sql_files[0])
+    out_path = resolve_output_path(args.output_name)
+    return report_query(*fetch_query(sql_files[0], args, out_path), sql_files[0], out_path, args)
+
+
+def main():
+    ensure_dirs()
+    args = parse_args()
+    if args.sample and args.sample_pct:
+        print('[ERROR] Use either --sample or --sample-pct, not both.', file=sys.stderr)
+        sys.exit(2)
+    if args.chunksize <= 0:
+        print('[ERROR] --chunksize must be a positive integer.', file=sys.stderr)
+        sys.exit(2)
+
+    if args.metrics:
+        METRICS.start()
+    summary, status = None, 'ok'
+    try:
+        summary = run(args)
+    except SystemExit as e:
+        status = f'exit code {e.code}'
+        raise
+    except BaseException as e:
+        status = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        close_snowflake_pool()
+        if args.metrics:
+            metrics_path = Path(args.metrics)
+            report = METRICS.write(metrics_path, argv=sys.argv[1:], engine=args.engine, status=status, **(summary or {}))
+            print_summary(report)
+            print(f'[INFO] Wrote metrics to: {metrics_path.resolve()}')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,142 @@
+"""
+Lightweight HTML/JSON report writer for the non-Sweetviz engines.
+
+The profile is a plain dict (see profile_stats.ProfileAccumulator.to_profile);
+the JSON file is written next to the HTML report with the same stem.
+"""
+import json
+from html import escape
+from pathlib import Path
+
+
+CSS = """
+body { font-family: sans-serif; margin: 2em auto; max-width: 1200px; color: #222; }
+table { border-collapse: collapse; margin: 1em 0; }
+th, td { border: 1px solid #ddd; padding: 0.3em 0.6em; text-align: left; font-size: 0.9em; }
+th { background: #f4f4f4; }
+td.num { text-align: right; font-variant-numeric: tabular-nums; }
+section.col { border-top: 1px solid #ccc; margin-top: 2em; }
+.hist { display: flex; align-items: flex-end; height: 80px; gap: 1px; }
+.hist div { background: #4a7ebb; flex: 1; min-width: 2px; }
+.muted { color: #777; font-size: 0.85em; }
+"""
+
+
+def fmt(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        return f'{value:,.4g}'
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f'{value:,}'
+    return escape(str(value))
+
+
+def render_histogram(hist: dict | None) -> str:
+    if not hist or not hist['counts']:
+        return ''
+    peak = max(hist['counts']) or 1
+    bars = ''.join(
+        f'<div style="height:{100 * c / peak:.1f}%" title="[{lo:.4g}, {hi:.4g}): {c:,}"></div>'
+        for c, lo, hi in zip(hist['counts'], hist['edges'][:-1], hist['edges'][1:])
+    )
+    return f'<div class="hist">{bars}</div><p class="muted">{fmt(hist["edges"][0])} … {fmt(hist["edges"][-1])}</p>'
+
+
+def render_column(col: dict) -> str:
+    stats = [
+        ('dtype', col.get('dtype')),
+        ('count', col.get('count')),
+        ('missing', f"{col.get('missing', 0):,} ({col.get('missing_pct', 0)}%)"),
+        ('distinct', f"~{fmt(col['distinct'])}" if col.get('distinct_approx') else col.get('distinct')),
+        ('min', col.get('min')),
+        ('max', col.get('max')),
+        ('mean', col.get('mean')),
+        ('std', col.get('std')),
+    ]
+    stats += list((col.get('quantiles') or {}).items())
+    rows = ''.join(f'<tr><th>{k}</th><td class="num">{fmt(v)}</td></tr>' for k, v in stats if v is not None)
+    top = col.get('top_values') or []
+    top_rows = ''.join(f'<tr><td>{fmt(v)}</td><td class="num">{fmt(c)}</td></tr>' for v, c in top)
+    top_note = ' (approximate)' if col.get('top_values_approx') else ''
+    top_html = f'<h4>Top values{top_note}</h4><table>{top_rows}</table>' if top_rows else ''
+    return (
+        f'<section class="col"><h3>{escape(col["name"])} <span class="muted">{escape(col.get("kind", ""))}</span></h3>'
+        f'<table>{rows}</table>{render_histogram(col.get("histogram"))}{top_html}</section>'
+    )
+
+
+def render_overview(columns: list) -> str:
+    head = '<tr><th>column</th><th>kind</th><th>dtype</th><th>missing %</th><th>distinct</th><th>mean</th><th>std</th><th>min</th><th>max</th></tr>'
+    body = ''.join(
+        f'<tr><td>{escape(c["name"])}</td><td>{escape(c.get("kind", ""))}</td><td>{escape(str(c.get("dtype", "")))}</td>'
+        f'<td class="num">{fmt(c.get("missing_pct"))}</td><td class="num">{fmt(c.get("distinct"))}</td>'
+        f'<td class="num">{fmt(c.get("mean"))}</td><td class="num">{fmt(c.get("std"))}</td>'
+        f'<td class="num">{fmt(c.get("min"))}</td><td class="num">{fmt(c.get("max"))}</td></tr>'
+        for c in columns
+    )
+    return f'<table>{head}{body}</table>'
+
+
+def render_correlations(corr: dict | None) -> str:
+    if not corr or not corr.get('top_pairs'):
+        return ''
+    rows = ''.join(
+        f'<tr><td>{escape(a)}</td><td>{escape(b)}</td><td class="num">{r:+.3f}</td></tr>'
+        for a, b, r in corr['top_pairs']
+    )
+    return f'<h2>Strongest correlations</h2><table><tr><th>column</th><th>column</th><th>pearson r</th></tr>{rows}</table>'
+
+
+def render_target(target: dict | None) -> str:
+    if not target:
+        return ''
+    rows = ''.join(
+        f'<tr><td>{escape(name)}</td><td>{escape(a["measure"])}</td><td class="num">{fmt(a["value"])}</td></tr>'
+        for name, a in target['associations'].items()
+    )
+    return (
+        f'<h2>Association with target <code>{escape(target["column"])}</code></h2>'
+        f'<table><tr><th>column</th><th>measure</th><th>value</th></tr>{rows}</table>'
+    )
+
+
+def render_html(profile: dict) -> str:
+    columns = profile.get('columns', [])
+    title = f"Profile – {profile.get('source', '')}"
+    return (
+        f'<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>{escape(title)}</title>'
+        f'<style>{CSS}</style></head><body>'
+        f'<h1>{escape(title)}</h1>'
+        f"<p class=\"muted\">engine: {escape(profile.get('engine', ''))} · generated {escape(profile.get('generated_at', ''))}</p>"
+        f"<p>{fmt(profile.get('rows'))} rows × {fmt(profile.get('n_columns'))} columns</p>"
+        f'<h2>Overview</h2>{render_overview(columns)}'
+        f"{render_target(profile.get('target'))}{render_correlations(profile.get('correlations'))}"
+        f'<h2>Columns</h2>{"".join(render_column(c) for c in columns)}'
+        '</body></html>'
+    )
+
+
+def write_report(profile: dict, out_path: Path) -> Path:
+    """Write `profile` as HTML to out_path and as JSON next to it; returns the JSON path."""
+    out_path.write_text(render_html(profile), encoding='utf-8')
+    json_path = out_path.with_suffix('.json')
+    json_path.write_text(json.dumps(profile, indent=2, default=str), encoding='utf-8')
+    return json_path
+
+
+def render_index(entries: list[dict]) -> str:
+    """Index page for --all batch runs: one row per input file, linking its report."""
+    head = '<tr><th>file</th><th>rows</th><th>columns</th><th>seconds</th><th>profiled at</th><th>status</th></tr>'
+    body = ''.join(
+        f'<tr><td>'
+        + (f'<a href="{escape(e["report"])}">{escape(e["file"])}</a>' if e.get('status') == 'ok' else escape(e['file']))
+        + f'</td><td class="num">{fmt(e.get("rows"))}</td><td class="num">{fmt(e.get("columns"))}</td>'
+        f'<td class="num">{fmt(e.get("seconds"))}</td><td>{escape(e.get("profiled_at", ""))}</td>'
+        f'<td>{escape(e.get("status", "")) if e.get("status") == "ok" else escape(e.get("error", "error"))}</td></tr>'
+        for e in entries
+    )
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>Profiles – Index</title>'
+        f'<style>{CSS}</style></head><body><h1>Profiles</h1><table>{head}{body}</table></body></html>'
+    )
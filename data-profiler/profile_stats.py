@@ -0,0 +1,318 @@
+"""
+Incremental per-column statistics for the streaming profiling engine.
+
+Each accumulator only ever holds a bounded amount of state (moments, a fixed
+number of histogram bins and fixed-size sketches), so profiling a file
+chunk-by-chunk keeps peak memory proportional to the chunk size. Accumulators
+can be merged and saved with to_state()/from_state(), which is what
+--incremental uses to fold new data into an existing profile.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from sketches import HeavyHitters, HyperLogLog, KLLSketch, hash_values
+
+
+HIST_BINS = 32
+TOP_K = 10
+TOP_K_CAPACITY = 1000
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def to_python(value):
+    """Convert numpy/pandas scalars into plain Python values for JSON output."""
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        try:
+            return value.item()
+        except (ValueError, TypeError):
+            pass
+    return value
+
+
+def column_kind(s: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(s):
+        return 'boolean'
+    if pd.api.types.is_numeric_dtype(s):
+        return 'numeric'
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return 'datetime'
+    return 'text'
+
+
+class StreamingHistogram:
+    """
+    Fixed-size histogram whose range grows as new data arrives.
+
+    When a value falls outside the current range, adjacent bins are merged in
+    pairs (doubling the bin width) until it fits, so the bin count never grows.
+    """
+
+    def __init__(self, n_bins: int = HIST_BINS):
+        if n_bins % 2:
+            raise ValueError('n_bins must be even')
+        self.n_bins = n_bins
+        self.lo = None
+        self.width = None
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+
+    def _coarsen(self) -> np.ndarray:
+        self.width *= 2
+        return self.counts.reshape(-1, 2).sum(axis=1)
+
+    def _extend(self, vmin: float, vmax: float):
+        half = np.zeros(self.n_bins // 2, dtype=np.int64)
+        while vmin < self.lo:
+            self.lo -= self.n_bins * self.width
+            self.counts = np.concatenate([half, self._coarsen()])
+        while vmax > self.lo + self.n_bins * self.width:
+            self.counts = np.concatenate([self._coarsen(), half])
+
+    def update(self, values: np.ndarray):
+        if values.size == 0:
+            return
+        vmin, vmax = float(values.min()), float(values.max())
+        if self.lo is None:
+            span = vmax - vmin
+            self.lo = vmin
+            self.width = span / self.n_bins if span > 0 else 1.0
+        self._extend(vmin, vmax)
+        idx = np.floor((values - self.lo) / self.width).astype(np.int64)
+        np.clip(idx, 0, self.n_bins - 1, out=idx)
+        self.counts += np.bincount(idx, minlength=self.n_bins)
+
+    def to_dict(self) -> dict | None:
+        if self.lo is None:
+            return None
+        nonzero = np.flatnonzero(self.counts)
+        first, last = nonzero[0], nonzero[-1] + 1
+        edges = self.lo + self.width * np.arange(first, last + 1)
+        return {'edges': edges.tolist(), 'counts': self.counts[first:last].tolist()}
+
+    def merge(self, other: 'StreamingHistogram'):
+        """Fold `other` in, re-binning its bins by their midpoints."""
+        if other.lo is None:
+            return
+        if self.lo is None:
+            self.lo, self.width, self.counts = other.lo, other.width, other.counts.copy()
+            return
+        half = np.zeros(self.n_bins // 2, dtype=np.int64)
+        while self.width < other.width:
+            self.counts = np.concatenate([self._coarsen(), half])
+        nonzero = np.flatnonzero(other.counts)
+        mids = other.lo + other.width * (nonzero + 0.5)
+        self._extend(float(mids.min()), float(mids.max()))
+        idx = np.clip(np.floor((mids - self.lo) / self.width).astype(np.int64), 0, self.n_bins - 1)
+        np.add.at(self.counts, idx, other.counts[nonzero])
+
+    def to_state(self) -> dict:
+        return {'n_bins': self.n_bins, 'lo': self.lo, 'width': self.width, 'counts': self.counts.tolist()}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'StreamingHistogram':
+        h = cls(state['n_bins'])
+        h.lo, h.width = state['lo'], state['width']
+        h.counts = np.asarray(state['counts'], dtype=np.int64)
+        return h
+
+
+class ColumnAccumulator:
+    def __init__(self, name: str):
+        self.name = name
+        self.dtype = None
+        self.kind = None
+        self.rows = 0
+        self.nulls = 0
+        # Running moments (Chan et al. parallel update)
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.hist = StreamingHistogram()
+        self.hll = HyperLogLog()
+        self.kll = KLLSketch()
+        self.top = HeavyHitters(TOP_K_CAPACITY)
+
+    def _observe_kind(self, kind: str | None):
+        if kind is None:
+            return
+        if self.kind is None:
+            self.kind = kind
+        elif self.kind != kind:
+            self.kind = 'mixed'
+
+    def _merge_moments(self, nb: int, mean_b: float, m2_b: float):
+        if nb == 0:
+            return
+        n = self.n + nb
+        delta = mean_b - self.mean
+        self.mean += delta * nb / n
+        self.m2 += m2_b + delta * delta * self.n * nb / n
+        self.n = n
+
+    def _update_range(self, lo, hi):
+        if lo is None:
+            return
+        try:
+            self.min = lo if self.min is None else min(self.min, lo)
+            self.max = hi if self.max is None else max(self.max, hi)
+        except TypeError:
+            pass  # mixed kinds across chunks (e.g. timestamps as text in a CSV); keep the first range
+
+    def update(self, s: pd.Series):
+        if self.dtype is None:
+            self.dtype = str(s.dtype)
+        self.rows += len(s)
+        valid = s.dropna()
+        self.nulls += len(s) - len(valid)
+        if valid.empty:
+            return
+
+        kind = column_kind(valid)
+        self._observe_kind(kind)
+        if kind == 'numeric':
+            values = valid.to_numpy(dtype=np.float64)
+            values = values[np.isfinite(values)]
+            if values.size:
+                mean_b = float(values.mean())
+                self._merge_moments(values.size, mean_b, float(((values - mean_b) ** 2).sum()))
+            self.hist.update(values)
+            self.kll.update(values)
+            self._update_range(valid.min(), valid.max())
+        elif kind == 'datetime':
+            self._update_range(valid.min(), valid.max())
+        hashes = hash_values(valid, kind == 'numeric')
+        self.hll.update(hashes)
+        self.top.update(valid, hashes, kind == 'numeric')
+
+    def merge(self, other: 'ColumnAccumulator'):
+        self.dtype = self.dtype or other.dtype
+        self._observe_kind(other.kind)
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self._merge_moments(other.n, other.mean, other.m2)
+        self._update_range(other.min, other.max)
+        self.hist.merge(other.hist)
+        self.hll.merge(other.hll)
+        self.kll.merge(other.kll)
+        self.top.merge(other.top)
+
+    def distinct(self) -> int | None:
+        if self.rows == self.nulls:
+            return 0
+        exact = self.top.distinct
+        if exact is not None:
+            return exact
+        # the HLL estimate can overshoot by a few percent; there are never more distinct values than non-null rows
+        return min(int(round(self.hll.estimate())), self.rows - self.nulls)
+
+    def to_dict(self) -> dict:
+        count = self.rows - self.nulls
+        out = {
+            'name': self.name,
+            'dtype': self.dtype,
+            'kind': self.kind or 'empty',
+            'count': count,
+            'missing': self.nulls,
+            'missing_pct': round(100.0 * self.nulls / self.rows, 3) if self.rows else 0.0,
+            'distinct': self.distinct(),
+            'distinct_approx': self.top.evicted,
+            'min': to_python(self.min),
+            'max': to_python(self.max),
+            'top_values': [[v, c] for v, c in self.top.top(TOP_K)],
+            'top_values_approx': self.top.evicted,
+        }
+        if self.n:
+            variance = self.m2 / (self.n - 1) if self.n > 1 else 0.0
+            quantiles = self.kll.quantiles(QUANTILES)
+            out.update({
+                'mean': self.mean,
+                'variance': variance,
+                'std': variance ** 0.5,
+                'quantiles': {f'{int(q * 100)}%': v for q, v in zip(QUANTILES, quantiles)},
+                'histogram': self.hist.to_dict(),
+            })
+        return out
+
+    def to_state(self) -> dict:
+        return {
+            'name': self.name,
+            'dtype': self.dtype,
+            'kind': self.kind,
+            'rows': self.rows,
+            'nulls': self.nulls,
+            'moments': [self.n, self.mean, self.m2],
+            'range': [to_python(self.min), to_python(self.max), isinstance(self.min, pd.Timestamp)],
+            'hist': self.hist.to_state(),
+            'hll': self.hll.to_state(),
+            'kll': self.kll.to_state(),
+            'top': self.top.to_state(),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'ColumnAccumulator':
+        acc = cls(state['name'])
+        acc.dtype, acc.kind = state['dtype'], state['kind']
+        acc.rows, acc.nulls = state['rows'], state['nulls']
+        acc.n, acc.mean, acc.m2 = state['moments']
+        lo, hi, is_timestamp = state['range']
+        if is_timestamp:
+            lo, hi = pd.Timestamp(lo), pd.Timestamp(hi)
+        acc.min, acc.max = lo, hi
+        acc.hist = StreamingHistogram.from_state(state['hist'])
+        acc.hll = HyperLogLog.from_state(state['hll'])
+        acc.kll = KLLSketch.from_state(state['kll'])
+        acc.top = HeavyHitters.from_state(state['top'])
+        return acc
+
+
+class ProfileAccumulator:
+    """Accumulates a profile over a stream of DataFrame chunks."""
+
+    def __init__(self):
+        self.rows = 0
+        self.chunks = 0
+        self.columns: dict[str, ColumnAccumulator] = {}
+
+    def update(self, df: pd.DataFrame):
+        self.rows += len(df)
+        self.chunks += 1
+        for name in df.columns:
+            acc = self.columns.get(name)
+            if acc is None:
+                acc = self.columns[name] = ColumnAccumulator(str(name))
+            acc.update(df[name])
+
+    def merge(self, other: 'ProfileAccumulator'):
+        self.rows += other.rows
+        self.chunks += other.chunks
+        for name, acc in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(acc)
+            else:
+                self.columns[name] = acc
+
+    def to_state(self) -> dict:
+        return {'rows': self.rows, 'chunks': self.chunks, 'columns': [acc.to_state() for acc in self.columns.values()]}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'ProfileAccumulator':
+        acc = cls()
+        acc.rows, acc.chunks = state['rows'], state['chunks']
+        acc.columns = {c['name']: ColumnAccumulator.from_state(c) for c in state['columns']}
+        return acc
+
+    def to_profile(self, source: str) -> dict:
+        return {
+            'source': source,
+            'engine': 'streaming',
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'rows': self.rows,
+            'n_columns': len(self.columns),
+            'chunks': self.chunks,
+            'columns': [acc.to_dict() for acc in self.columns.values()],
+        }
@@ -0,0 +1,200 @@
+"""
+Warehouse-side profiling for --pushdown.
+
+Instead of fetching rows, the columns of the query are introspected with a
+LIMIT 0 query and a single aggregate query over `WITH src AS (...)` computes
+counts, nulls, approximate distinct counts, min/max/mean/stddev, approximate
+percentiles and top-k values per column. Only that one result row crosses the
+wire; it is turned into the same profile dict the other engines produce.
+"""
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime
+from decimal import Decimal
+
+from profile_stats import QUANTILES, TOP_K, to_python
+
+
+class Dialect(ABC):
+    name = ''
+    top_k_approx = True
+
+    def quote(self, ident: str) -> str:
+        return '"' + ident.replace('"', '""') + '"'
+
+    @abstractmethod
+    def classify(self, type_code) -> tuple[str, str]:
+        """(kind, dtype) of a cursor.description type code."""
+
+    @abstractmethod
+    def approx_distinct(self, col: str) -> str:
+        ...
+
+    @abstractmethod
+    def quantile(self, col: str, q: float) -> str:
+        ...
+
+    @abstractmethod
+    def top_k(self, col: str, k: int) -> str:
+        ...
+
+    @abstractmethod
+    def parse_top_k(self, value) -> list:
+        ...
+
+
+class SnowflakeDialect(Dialect):
+    name = 'snowflake'
+    # snowflake.connector.constants.FIELD_TYPES
+    TYPES = {
+        0: ('numeric', 'FIXED'), 1: ('numeric', 'REAL'), 2: ('text', 'TEXT'), 3: ('datetime', 'DATE'),
+        4: ('datetime', 'TIMESTAMP'), 5: ('other', 'VARIANT'), 6: ('datetime', 'TIMESTAMP_LTZ'),
+        7: ('datetime', 'TIMESTAMP_TZ'), 8: ('datetime', 'TIMESTAMP_NTZ'), 9: ('other', 'OBJECT'),
+        10: ('other', 'ARRAY'), 11: ('other', 'BINARY'), 12: ('datetime', 'TIME'), 13: ('boolean', 'BOOLEAN'),
+    }
+
+    def classify(self, type_code) -> tuple[str, str]:
+        return self.TYPES.get(type_code, ('other', str(type_code)))
+
+    def approx_distinct(self, col: str) -> str:
+        return f'APPROX_COUNT_DISTINCT({col})'
+
+    def quantile(self, col: str, q: float) -> str:
+        return f'APPROX_PERCENTILE({col}, {q})'
+
+    def top_k(self, col: str, k: int) -> str:
+        return f'APPROX_TOP_K({col}, {k})'
+
+    def parse_top_k(self, value) -> list:
+        # APPROX_TOP_K returns a JSON array of [value, count] pairs
+        pairs = json.loads(value) if isinstance(value, str) else (value or [])
+        return [[v, int(c)] for v, c in pairs if v is not None]
+
+
+class DuckDBDialect(Dialect):
+    """For the local stand-in. DuckDB's approx_top_k has no counts, so top-k is an exact GROUP BY subquery."""
+    name = 'duckdb'
+    NUMERIC = ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT', 'UTINYINT', 'USMALLINT', 'UINTEGER',
+               'UBIGINT', 'UHUGEINT', 'FLOAT', 'DOUBLE', 'REAL', 'DECIMAL')
+    top_k_approx = False
+
+    def classify(self, type_code) -> tuple[str, str]:
+        dtype = str(type_code).upper()
+        if dtype.endswith(']') or dtype.startswith(('STRUCT', 'MAP', 'UNION')):
+            return 'other', dtype
+        if dtype.startswith(self.NUMERIC):
+            return 'numeric', dtype
+        if dtype.startswith(('TIMESTAMP', 'DATE', 'TIME')):
+            return 'datetime', dtype
+        if dtype == 'BOOLEAN':
+            return 'boolean', dtype
+        return 'text', dtype
+
+    def approx_distinct(self, col: str) -> str:
+        return f'approx_count_distinct({col})'
+
+    def quantile(self, col: str, q: float) -> str:
+        return f'approx_quantile({col}, {q})'
+
+    def top_k(self, col: str, k: int) -> str:
+        return (f"(SELECT list({{'v': v, 'c': c}} ORDER BY c DESC) FROM "
+                f'(SELECT {col} AS v, COUNT(*) AS c FROM src WHERE {col} IS NOT NULL GROUP BY 1 ORDER BY 2 DESC LIMIT {k}))')
+
+    def parse_top_k(self, value) -> list:
+        return [[e['v'], int(e['c'])] for e in value or []]
+
+
+DIALECTS = {d.name: d for d in (SnowflakeDialect(), DuckDBDialect())}
+
+
+def describe_sql(sql: str) -> str:
+    """Zero-row query whose cursor.description lists the result columns of `sql`."""
+    return f'SELECT * FROM ({sql}) AS src LIMIT 0'
+
+
+def column_kinds(description, dialect: Dialect) -> list[tuple[str, str, str]]:
+    """(name, kind, dtype) per column of a cursor.description."""
+    return [(d[0], *dialect.classify(d[1])) for d in description]
+
+
+def aggregate_sql(sql: str, columns: list[tuple[str, str, str]], dialect: Dialect, top_k: int = TOP_K) -> tuple[str, list]:
+    """
+    One aggregate query over `sql` computing every statistic for every column.
+    Returns the SQL and the (column index, statistic) each output position holds.
+    """
+    exprs, slots = ['COUNT(*)'], [(None, 'rows')]
+
+    def add(expr: str, i: int, stat: str):
+        exprs.append(expr)
+        slots.append((i, stat))
+
+    for i, (name, kind, _) in enumerate(columns):
+        col = dialect.quote(name)
+        add(f'COUNT({col})', i, 'count')
+        if kind == 'other':
+            continue
+        add(dialect.approx_distinct(col), i, 'distinct')
+        if kind in ('numeric', 'datetime'):
+            add(f'MIN({col})', i, 'min')
+            add(f'MAX({col})', i, 'max')
+        if kind == 'numeric':
+            add(f'AVG({col})', i, 'mean')
+            add(f'STDDEV_SAMP({col})', i, 'std')
+            for q in QUANTILES:
+                add(dialect.quantile(col, q), i, f'{int(q * 100)}%')
+        else:
+            add(dialect.top_k(col, top_k), i, 'top_values')
+    select = ',\n  '.join(f'{e} AS s{j}' for j, e in enumerate(exprs))
+    return f'WITH src AS ({sql})\nSELECT\n  {select}\nFROM src', slots
+
+
+def as_number(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    return to_python(value)
+
+
+def build_profile(row, slots: list, columns: list[tuple[str, str, str]], dialect: Dialect, source: str) -> dict:
+    stats = [{} for _ in columns]
+    rows = 0
+    for (i, stat), value in zip(slots, row):
+        if i is None:
+            rows = int(value or 0)
+        else:
+            stats[i][stat] = value
+
+    profile_columns = []
+    for (name, kind, dtype), s in zip(columns, stats):
+        count = int(s.get('count') or 0)
+        col = {
+            'name': name,
+            'dtype': dtype,
+            'kind': kind,
+            'count': count,
+            'missing': rows - count,
+            'missing_pct': round(100.0 * (rows - count) / rows, 3) if rows else 0.0,
+            'distinct': min(int(s['distinct']), count) if s.get('distinct') is not None else None,
+            'distinct_approx': True,
+        }
+        if kind == 'numeric':
+            col.update({'min': as_number(s.get('min')), 'max': as_number(s.get('max')), 'mean': as_number(s.get('mean'))})
+            std = as_number(s.get('std'))
+            col.update({'std': std, 'variance': None if std is None else std * std})
+            quantiles = {f'{int(q * 100)}%': as_number(s.get(f'{int(q * 100)}%')) for q in QUANTILES}
+            if any(v is not None for v in quantiles.values()):
+                col['quantiles'] = quantiles
+        elif kind == 'datetime':
+            col.update({'min': to_python(s.get('min')), 'max': to_python(s.get('max'))})
+        if 'top_values' in s:
+            col['top_values'] = [[to_python(v), c] for v, c in dialect.parse_top_k(s['top_values'])]
+            col['top_values_approx'] = dialect.top_k_approx
+        profile_columns.append(col)
+
+    return {
+        'source': source,
+        'engine': 'pushdown',
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'rows': rows,
+        'n_columns': len(columns),
+        'columns': profile_columns,
+    }
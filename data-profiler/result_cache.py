@@ -0,0 +1,108 @@
+"""
+On-disk cache of Snowflake query results, stored as Parquet.
+
+Entries are keyed on the normalized SQL plus the connection context
+(database/schema/role), expire after a TTL, and are evicted least-recently-used
+first once the cache grows beyond its size budget.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from pathlib import Path
+
+
+QUOTED_RE = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace outside quoted literals/identifiers and drop a trailing ';'."""
+    parts = QUOTED_RE.split(sql.strip().rstrip(';').strip())
+    return ''.join(p if i % 2 else re.sub(r'\s+', ' ', p) for i, p in enumerate(parts)).strip()
+
+
+def cache_key(sql: str, context: dict) -> str:
+    payload = json.dumps({'sql': normalize_sql(sql), **context}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    _lock = threading.Lock()  # shared: concurrent queries each open their own ResultCache on the same index
+
+    def __init__(self, root: Path, ttl_seconds: float, max_bytes: int):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.index_path = root / 'index.json'
+        root.mkdir(parents=True, exist_ok=True)
+
+    def _load_index(self) -> dict:
+        try:
+            return json.loads(self.index_path.read_text(encoding='utf-8'))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self, index: dict):
+        tmp = self.index_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(index, indent=2), encoding='utf-8')
+        tmp.replace(self.index_path)
+
+    def path(self, key: str) -> Path:
+        return self.root / f'{key}.parquet'
+
+    def pending_path(self, key: str) -> Path:
+        return self.root / f'{key}.parquet.partial'
+
+    def lookup(self, key: str) -> Path | None:
+        """Return the cached Parquet file for `key`, or None if missing or expired."""
+        with self._lock:
+            index = self._load_index()
+            entry = index.get(key)
+            path = self.path(key)
+            if entry is None or not path.exists():
+                return None
+            if time.time() - entry['created'] > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                del index[key]
+                self._save_index(index)
+                return None
+            entry['last_access'] = time.time()
+            self._save_index(index)
+            return path
+
+    def commit(self, key: str, sql: str) -> Path:
+        """Promote the pending file written for `key` to a cache entry and enforce the size budget."""
+        with self._lock:
+            path = self.path(key)
+            self.pending_path(key).replace(path)
+            index = self._load_index()
+            now = time.time()
+            index[key] = {
+                'created': now,
+                'last_access': now,
+                'bytes': path.stat().st_size,
+                'sql': normalize_sql(sql)[:200],
+            }
+            self._evict(index, keep=key)
+            self._save_index(index)
+            return path
+
+    def discard(self, key: str):
+        self.pending_path(key).unlink(missing_ok=True)
+
+    def _evict(self, index: dict, keep: str):
+        now = time.time()
+        for k in [k for k, e in index.items() if now - e['created'] > self.ttl_seconds and k != keep]:
+            self.path(k).unlink(missing_ok=True)
+            del index[k]
+        total = sum(e['bytes'] for e in index.values())
+        for k, e in sorted(index.items(), key=lambda kv: kv[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            if k == keep:
+                continue
+            self.path(k).unlink(missing_ok=True)
+            total -= e['bytes']
+            del index[k]
+            print(f'[INFO] Evicted cached result {k[:12]}… ({e["bytes"] / 1e6:.1f} MB)')
@@ -0,0 +1,263 @@
+"""
+Mergeable, serializable sketches for incremental profiling.
+
+- HyperLogLog: distinct counts
+- KLLSketch: quantiles
+- CountMinSketch + HeavyHitters: approximate top-k values
+
+Every sketch supports update(), merge() and a JSON-friendly to_state()/from_state()
+so a saved profile can absorb new data without re-reading the old data.
+"""
+import base64
+
+import numpy as np
+import pandas as pd
+
+
+def hash_values(values: pd.Series, numeric: bool) -> np.ndarray:
+    """Stable 64-bit hashes; numeric values hash as float64 so 1 and 1.0 collide across chunks."""
+    if numeric:
+        return pd.util.hash_array(values.to_numpy(dtype=np.float64))
+    return pd.util.hash_array(values.astype(str).to_numpy(dtype=object))
+
+
+def json_value(value):
+    """Plain Python value for a sketch candidate; anything JSON can't hold is kept as its string form."""
+    if hasattr(value, 'item'):
+        try:
+            value = value.item()
+        except (ValueError, TypeError):
+            pass
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def encode_array(a: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(a).tobytes()).decode('ascii')
+
+
+def decode_array(s: str, dtype, shape=None) -> np.ndarray:
+    a = np.frombuffer(base64.b64decode(s), dtype=dtype).copy()
+    return a.reshape(shape) if shape is not None else a
+
+
+class HyperLogLog:
+    def __init__(self, p: int = 12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray):
+        if hashes.size == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest_bits = 64 - self.p
+        rest = (hashes & np.uint64((1 << rest_bits) - 1)).astype(np.float64)
+        # rank = position of the leftmost 1-bit in the remaining bits (frexp gives floor(log2) + 1 exactly)
+        _, exp = np.frexp(rest)
+        rank = np.where(rest > 0, rest_bits - exp + 1, rest_bits + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other: 'HyperLogLog'):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        est = alpha * self.m * self.m / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = int((self.registers == 0).sum())
+        if est <= 2.5 * self.m and zeros:
+            est = self.m * np.log(self.m / zeros)  # linear counting for small cardinalities
+        return float(est)
+
+    def to_state(self) -> dict:
+        return {'p': self.p, 'registers': encode_array(self.registers)}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'HyperLogLog':
+        h = cls(state['p'])
+        h.registers = decode_array(state['registers'], np.uint8)
+        return h
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch: level h holds items of weight 2**h. When a level overflows
+    its capacity it is sorted and every other item (random offset) moves up a level.
+    """
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        self.k = k
+        self.levels: list[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - 1 - h
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                level = np.sort(level)
+                keep = level[-1:] if len(level) % 2 else level[:0]
+                even = level[: len(level) - len(keep)]
+                promoted = even[self._rng.integers(2)::2]
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def update(self, values: np.ndarray):
+        if values.size == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values.astype(np.float64)])
+        self._compress()
+
+    def merge(self, other: 'KLLSketch'):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self._compress()
+
+    def quantiles(self, qs) -> list[float] | None:
+        items = np.concatenate(self.levels)
+        if items.size == 0:
+            return None
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items)
+        items, cum = items[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cum, np.asarray(qs) * cum[-1], side='left')
+        return items[np.minimum(idx, len(items) - 1)].tolist()
+
+    def to_state(self) -> dict:
+        return {'k': self.k, 'levels': [level.tolist() for level in self.levels]}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'KLLSketch':
+        s = cls(state['k'])
+        s.levels = [np.asarray(level, dtype=np.float64) for level in state['levels']] or [np.empty(0)]
+        return s
+
+
+class CountMinSketch:
+    SALTS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+                      0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53], dtype=np.uint64)
+
+    def __init__(self, depth: int = 4, width_bits: int = 10):
+        self.depth = depth
+        self.width_bits = width_bits
+        self.table = np.zeros((depth, 1 << width_bits), dtype=np.int64)
+
+    def _indexes(self, hashes: np.ndarray) -> np.ndarray:
+        hashes = hashes.astype(np.uint64, copy=False)
+        with np.errstate(over='ignore'):
+            mixed = (hashes[None, :] ^ self.SALTS[: self.depth, None]) * np.uint64(0x9E3779B97F4A7C15)
+        return (mixed >> np.uint64(64 - self.width_bits)).astype(np.int64)
+
+    def update(self, hashes: np.ndarray):
+        if hashes.size == 0:
+            return
+        width = self.table.shape[1]
+        for row, idx in enumerate(self._indexes(hashes)):
+            self.table[row] += np.bincount(idx, minlength=width)
+
+    def query(self, hashes: np.ndarray) -> np.ndarray:
+        """Count-mean-min estimate: each row's cell minus that row's expected collision noise, median across rows."""
+        idx = self._indexes(hashes)
+        cells = self.table[np.arange(self.depth)[:, None], idx]
+        total = self.table[0].sum()
+        noise = (total - cells) / (self.table.shape[1] - 1)
+        est = np.median(cells - noise, axis=0)
+        return np.clip(np.round(est), 0, cells.min(axis=0)).astype(np.int64)
+
+    def merge(self, other: 'CountMinSketch'):
+        self.table += other.table
+
+    def to_state(self) -> dict:
+        return {'depth': self.depth, 'width_bits': self.width_bits, 'table': encode_array(self.table)}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'CountMinSketch':
+        s = cls(state['depth'], state['width_bits'])
+        s.table = decode_array(state['table'], np.int64, s.table.shape)
+        return s
+
+
+class HeavyHitters:
+    """
+    Top-k values: a count-min sketch for frequencies plus a bounded set of candidate values.
+    Candidate counts are exact until a candidate is first evicted; after that the sketch's estimates are used.
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.cms = CountMinSketch()
+        self.candidates: dict[int, list] = {}  # hash -> [value, count]
+        self.evicted = False
+
+    def _prune(self):
+        if len(self.candidates) <= self.capacity:
+            return
+        keys = np.fromiter(self.candidates.keys(), dtype=np.uint64, count=len(self.candidates))
+        keep = keys[np.argsort(-self.cms.query(keys), kind='stable')[: self.capacity]]
+        self.candidates = {int(k): self.candidates[int(k)] for k in keep}
+        self.evicted = True
+
+    def update(self, values: pd.Series, hashes: np.ndarray, numeric: bool):
+        self.cms.update(hashes)
+        counts = values.value_counts()
+        if len(counts) > self.capacity:
+            self.evicted = True
+        heavy = counts.iloc[: self.capacity]
+        for h, value, count in zip(hash_values(pd.Series(heavy.index), numeric).tolist(), heavy.index, heavy.tolist()):
+            entry = self.candidates.setdefault(h, [json_value(value), 0])
+            entry[1] += count
+        self._prune()
+
+    def merge(self, other: 'HeavyHitters'):
+        self.cms.merge(other.cms)
+        for h, (value, count) in other.candidates.items():
+            entry = self.candidates.setdefault(h, [value, 0])
+            entry[1] += count
+        self.evicted = self.evicted or other.evicted
+        self._prune()
+
+    @property
+    def distinct(self) -> int | None:
+        """Exact number of distinct values, while every value seen is still a candidate."""
+        return None if self.evicted else len(self.candidates)
+
+    def top(self, k: int) -> list:
+        if not self.candidates:
+            return []
+        keys = np.fromiter(self.candidates.keys(), dtype=np.uint64, count=len(self.candidates))
+        if self.evicted:
+            counts = self.cms.query(keys)
+            # below e * N / width an estimate can't be told apart from collision noise
+            bound = np.e * self.cms.table[0].sum() / self.cms.table.shape[1]
+            keys, counts = keys[counts > bound], counts[counts > bound]
+        else:
+            counts = np.array([self.candidates[int(h)][1] for h in keys], dtype=np.int64)
+        order = np.argsort(-counts, kind='stable')[:k]
+        return [(self.candidates[int(keys[i])][0], int(counts[i])) for i in order]
+
+    def to_state(self) -> dict:
+        return {
+            'capacity': self.capacity,
+            'cms': self.cms.to_state(),
+            'candidates': [[str(h), v, c] for h, (v, c) in self.candidates.items()],
+            'evicted': self.evicted,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'HeavyHitters':
+        s = cls(state['capacity'])
+        s.cms = CountMinSketch.from_state(state['cms'])
+        s.candidates = {int(h): [v, c] for h, v, c in state['candidates']}
+        s.evicted = state['evicted']
+        return s
@@ -0,0 +1,24 @@
+"""
+Distinct counts must never exceed the number of non-null values,
+even where the HyperLogLog estimate overshoots.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from profile_stats import ColumnAccumulator  # noqa: E402
+
+
+def test_distinct_is_clamped_to_non_null_rows():
+    acc = ColumnAccumulator('id')
+    values = pd.Series(np.arange(200_000, dtype=float))
+    values[::10] = np.nan
+    acc.update(values)
+    assert acc.top.distinct is None  # past the exact tracker, so this is the HLL estimate
+    assert acc.hll.estimate() > acc.rows - acc.nulls
+    assert acc.distinct() == acc.rows - acc.nulls
@@ -0,0 +1,66 @@
+"""
+With --sample in snowflake mode, a cached unsampled result of the same query is
+sampled locally (seeded, like local mode) and the warehouse is never queried.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import profile_dataset  # noqa: E402
+from result_cache import cache_key  # noqa: E402
+
+
+@pytest.fixture
+def cached_full(tmp_path, monkeypatch):
+    """query.sql with its unsampled result in a fresh cache; any warehouse access fails the test."""
+    monkeypatch.setattr(profile_dataset, 'CACHE_DIR', tmp_path / 'cache')
+    monkeypatch.setenv('SNOWFLAKE_STANDIN', ':memory:')
+
+    def no_warehouse(*args, **kwargs):
+        raise AssertionError('the warehouse was queried')
+    monkeypatch.setattr(profile_dataset, 'iter_snowflake_batches', no_warehouse)
+    monkeypatch.setattr(profile_dataset, 'get_snowflake_connection', no_warehouse)
+
+    sql_file = tmp_path / 'query.sql'
+    sql_file.write_text('SELECT * FROM events', encoding='utf-8')
+    full = pd.DataFrame({'id': np.arange(5000), 'value': np.arange(5000) % 7})
+    cache = profile_dataset.ResultCache(profile_dataset.CACHE_DIR, ttl_seconds=3600, max_bytes=1 << 30)
+    sql = profile_dataset.build_sql(None, sql_file=sql_file)
+    key = cache_key(sql, profile_dataset.snowflake_context())
+    full.to_parquet(cache.pending_path(key), index=False)
+    cache.commit(key, sql)
+    return sql_file, full
+
+
+def run(sql_file, monkeypatch, *flags):
+    monkeypatch.setattr(sys, 'argv', ['profile_dataset.py', '--mode', 'snowflake', *flags])
+    args = profile_dataset.parse_args()
+    return profile_dataset.collect(profile_dataset.snowflake_chunks(args, sql_file))
+
+
+def test_sample_is_drawn_locally_from_the_cached_result(cached_full, monkeypatch):
+    sql_file, full = cached_full
+    sample = run(sql_file, monkeypatch, '--sample', '300', '--chunksize', '1000')
+    expected = profile_dataset.reservoir_sample(iter([full]), 300, profile_dataset.SAMPLE_SEED)
+    pd.testing.assert_frame_equal(sample, expected)
+
+
+def test_cached_sample_is_repeatable_for_a_seed(cached_full, monkeypatch):
+    sql_file, _ = cached_full
+    first = run(sql_file, monkeypatch, '--sample', '300', '--sample-seed', '7')
+    again = run(sql_file, monkeypatch, '--sample', '300', '--sample-seed', '7')
+    other = run(sql_file, monkeypatch, '--sample', '300', '--sample-seed', '8')
+    pd.testing.assert_frame_equal(first, again)
+    assert not first['id'].equals(other['id'])
+
+
+def test_refresh_skips_the_cached_result(cached_full, monkeypatch):
+    sql_file, _ = cached_full
+    with pytest.raises(AssertionError, match='warehouse'):
+        run(sql_file, monkeypatch, '--sample', '300', '--refresh')
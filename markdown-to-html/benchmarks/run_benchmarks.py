@@ -0,0 +1,143 @@
+"""
+Rendering throughput of markdown_to_html.py versus worker count.
+
+Generates a synthetic Markdown corpus (cached in benchmarks/data), then runs a
+forced full build of it once per worker count and reports files/s, MB/s and the
+speedup over a single process. Results go to benchmarks/results/<timestamp>.json.
+
+    python benchmarks/run_benchmarks.py --files 5000 --workers 1,2,4,8
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(TOOL_DIR, "benchmarks", "data")
+RESULTS_DIR = os.path.join(TOOL_DIR, "benchmarks", "results")
+SEED = 42
+
+sys.path.insert(0, TOOL_DIR)
+os.chdir(TOOL_DIR)  # templates and the bytecode cache are resolved relative to the tool folder
+
+import markdown_to_html  # noqa: E402
+
+WORDS = ("data", "pipeline", "profile", "schema", "table", "query", "warehouse", "column", "render",
+         "index", "markdown", "template", "cache", "worker", "batch", "stream", "token", "release")
+
+
+def int_list(arg):
+    return [int(x) for x in arg.split(",") if x.strip()]
+
+
+def default_workers():
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    return counts if counts[-1] == cpus else counts + [cpus]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark markdown_to_html.py rendering throughput per worker count")
+    parser.add_argument("--files", type=int, default=5000, help="Documents in the synthetic corpus (default: 5000)")
+    parser.add_argument("--sections", type=int, default=8, help="Sections per document (default: 8)")
+    parser.add_argument("--workers", type=int_list, default=default_workers(),
+                        help="Comma-separated worker counts (default: powers of two up to the CPU count)")
+    parser.add_argument("--render", choices=tuple(markdown_to_html.PAGE_TEMPLATES), default="client",
+                        help="Page rendering mode to benchmark (default: client)")
+    parser.add_argument("--repeat", type=int, default=3, help="Builds per worker count; the median is reported (default: 3)")
+    return parser.parse_args()
+
+
+def sentence(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+
+def synthetic_document(rng, sections):
+    """Headings, paragraphs, lists, a table, code and now and then a mermaid diagram."""
+    parts = [f"# {sentence(rng)[:40]}\n"]
+    for s in range(sections):
+        parts.append(f"## Section {s + 1}\n\n" + " ".join(sentence(rng) for _ in range(rng.randint(3, 8))) + "\n")
+        parts.append("\n".join(f"- {sentence(rng)}" for _ in range(rng.randint(2, 5))) + "\n")
+        if s % 3 == 0:
+            rows = "\n".join(f"| {rng.choice(WORDS)} | {rng.randint(0, 9999)} | `{rng.choice(WORDS)}` |" for _ in range(5))
+            parts.append(f"| name | value | code |\n|---|---|---|\n{rows}\n")
+        if s % 4 == 1:
+            parts.append(f"```python\nresult = {rng.choice(WORDS)}(\"{rng.choice(WORDS)}\")  # ${{value}}\n```\n")
+    if rng.random() < 0.1:
+        parts.append("```mermaid\ngraph TD\n  A[Source] --> B[Render]\n  B --> C[Index]\n```\n")
+    return "\n".join(parts)
+
+
+def corpus(files, sections):
+    path = os.path.join(DATA_DIR, f"corpus_{files}x{sections}")
+    if os.path.isdir(path) and len(os.listdir(path)) == files:
+        return path
+    print(f"🧪 Generating {files} documents in {path}…")
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    rng = random.Random(SEED)
+    for i in range(files):
+        with open(os.path.join(path, f"doc_{i:06d}.md"), "w", encoding="utf-8") as f:
+            f.write(synthetic_document(rng, sections))
+    return path
+
+
+def build_once(source_dir, workers, render):
+    with tempfile.TemporaryDirectory() as out:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            markdown_to_html.convert_md_to_html(source_dir, out, {}, force=True, workers=workers, render=render)
+        return time.perf_counter() - started
+
+
+def main():
+    args = parse_args()
+    source_dir = corpus(args.files, args.sections)
+    mb = sum(e.stat().st_size for e in os.scandir(source_dir)) / 2**20
+    markdown_to_html.warm_worker(args.render)  # fill the bytecode cache so every worker count starts equal
+
+    results = []
+    for workers in args.workers:
+        wall = statistics.median(build_once(source_dir, workers, args.render) for _ in range(max(1, args.repeat)))
+        results.append({
+            "workers": workers,
+            "render": args.render,
+            "files": args.files,
+            "corpus_mb": round(mb, 2),
+            "wall_s": round(wall, 4),
+            "files_per_s": round(args.files / wall, 1),
+            "mb_per_s": round(mb / wall, 2),
+        })
+    base = results[0]["wall_s"]
+    for r in results:
+        r["speedup"] = round(base / r["wall_s"], 2)
+
+    print(f"\n{'workers':>8}{'wall s':>10}{'files/s':>12}{'MB/s':>9}{'speedup':>9}")
+    for r in results:
+        print(f"{r['workers']:>8}{r['wall_s']:>10.3f}{r['files_per_s']:>12,.0f}{r['mb_per_s']:>9.1f}{r['speedup']:>8.2f}x")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out = os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "cpu_count": os.cpu_count(),
+            "python": sys.version.split()[0],
+            "repeat": args.repeat,
+            "results": results,
+        }, f, indent=2)
+    print(f"\n📄 Wrote results to: {out}")
+
+
+if __name__ == "__main__":
+    main()
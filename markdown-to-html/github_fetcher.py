@@ -0,0 +1,288 @@
+"""
+Concurrent, cache-aware download of markdown files from GitHub.
+
+One pooled requests.Session is shared by a bounded thread pool. The listing is
+requested with the ETag of the previous run, so an unchanged source costs a
+single 304. Files whose git blob `sha` matches the local cache are not
+downloaded at all, and the rest are fetched with If-None-Match. Rate-limit and
+server errors are retried with backoff. Set GITHUB_API_URL to point the fetcher
+at GitHub Enterprise or a local stand-in.
+
+Modes:
+- contents: the folder's contents listing plus one download per changed file (no subfolders)
+- tree:     one recursive Git Trees call for the whole subtree plus one blob download per changed file
+- tarball:  one streamed archive of the branch; only the matching .md members are written
+"""
+import hashlib
+import json
+import os
+import tarfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_API_URL = "https://api.github.com"
+CACHE_NAME = ".fetch_cache.json"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+FETCH_MODES = ("contents", "tree", "tarball")
+
+
+class FetchError(Exception):
+    pass
+
+
+def parse_tree_url(repo_url):
+    """(owner, repo, branch, path) of a https://github.com/<owner>/<repo>/tree/<branch>/<path> URL."""
+    parts = repo_url.rstrip("/").split("/")
+    if len(parts) < 7 or parts[5] != "tree":
+        raise FetchError("Invalid GitHub URL (must contain 'tree').")
+    return parts[3], parts[4], parts[6], "/".join(parts[7:])
+
+
+def git_blob_sha(data):
+    """The sha GitHub reports for a file with this content."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def safe_relpath(path):
+    """`path` if it is a plain relative path, else None (archives and trees can't write outside the output folder)."""
+    parts = path.split("/")
+    if not path or any(part in ("", ".", "..") for part in parts) or "\\" in path:
+        return None
+    return path
+
+
+def local_path(output_dir, relpath):
+    return os.path.join(output_dir, *relpath.split("/"))
+
+
+def remove_file(root, relpath):
+    """Delete a file below `root` and any folders it leaves empty."""
+    path = local_path(root, relpath)
+    if os.path.exists(path):
+        os.remove(path)
+    folder = os.path.dirname(path)
+    while os.path.normpath(folder) != os.path.normpath(root):
+        try:
+            os.rmdir(folder)
+        except OSError:
+            break
+        folder = os.path.dirname(folder)
+
+
+def write_atomic(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class GitHubFetcher:
+    def __init__(self, token, workers=8, api_url=None, max_retries=5, backoff=1.0, max_wait=60.0, timeout=30):
+        self.api_url = (api_url or os.getenv("GITHUB_API_URL") or DEFAULT_API_URL).rstrip("/")
+        self.workers = max(1, workers)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept": "application/vnd.github.v3+json"})
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        self.requests_sent = 0
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.session.close()
+
+    def _retry_delay(self, response, attempt):
+        """Seconds to wait before retrying, or None if the response shouldn't be retried."""
+        if response is not None:
+            headers = response.headers
+            rate_limited = response.status_code in (403, 429) and (
+                headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in headers
+            )
+            if not rate_limited and response.status_code not in RETRY_STATUSES:
+                return None
+            if "Retry-After" in headers:
+                return float(headers["Retry-After"])
+            if headers.get("X-RateLimit-Remaining") == "0" and "X-RateLimit-Reset" in headers:
+                return max(0.0, float(headers["X-RateLimit-Reset"]) - time.time()) + 1
+        return self.backoff * 2 ** attempt
+
+    def get(self, url, etag=None, headers=None, **kwargs):
+        """GET with If-None-Match, retrying rate limits, 5xx and connection errors."""
+        headers = dict(headers or {})
+        if etag:
+            headers["If-None-Match"] = etag
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                with self._lock:
+                    self.requests_sent += 1
+                response = self.session.get(url, headers=headers, timeout=self.timeout, **kwargs)
+                if response.status_code in (200, 304):
+                    return response
+                delay = self._retry_delay(response, attempt)
+                if delay is None:
+                    raise FetchError(f"{response.status_code} {response.reason} for {url}")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                delay = self._retry_delay(None, attempt)
+                if attempt == self.max_retries:
+                    raise FetchError(f"{e.__class__.__name__} for {url}") from e
+            if attempt == self.max_retries:
+                break
+            if delay > self.max_wait:
+                raise FetchError(f"Rate limit exhausted; retry in {delay:.0f}s ({url})")
+            print(f"⏳ {response.status_code if response is not None else 'Connection error'}, retrying in {delay:.1f}s: {url}")
+            time.sleep(delay)
+        raise FetchError(f"Giving up after {self.max_retries + 1} attempts: {url}")
+
+    @staticmethod
+    def load_cache(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    @staticmethod
+    def save_cache(path, cache):
+        write_atomic(path, json.dumps(cache, indent=2, sort_keys=True).encode("utf-8"))
+
+    def _download(self, relpath, sha, url, local, cached):
+        etag = cached.get("etag") if cached and os.path.exists(local) else None
+        # blob URLs from the Trees API return JSON unless the raw media type is requested
+        response = self.get(url, etag=etag, headers={"Accept": "application/vnd.github.raw"})
+        if response.status_code == 304:
+            return {"sha": sha, "etag": etag}, False
+        write_atomic(local, response.content)
+        return {"sha": sha, "etag": response.headers.get("ETag")}, True
+
+    def _contents_entries(self, response):
+        items = response.json()
+        folders = [e["name"] for e in items if e.get("type") == "dir"]
+        if folders:
+            print(f"⚠️  Skipping {len(folders)} subfolder(s) ({', '.join(folders[:5])}); use --fetch-mode tree or tarball to include them.")
+        return [(e["name"], e["sha"], e["download_url"]) for e in items
+                if e.get("type", "file") == "file" and e["name"].endswith(".md")]
+
+    def _tree_entries(self, response, path):
+        """The .md blobs under `path`, or None if GitHub truncated the listing (it is then incomplete)."""
+        tree = response.json()
+        if tree.get("truncated"):
+            return None
+        prefix = f"{path}/" if path else ""
+        entries = []
+        for e in tree["tree"]:
+            if e["type"] == "blob" and e["path"].startswith(prefix) and e["path"].endswith(".md"):
+                relpath = safe_relpath(e["path"][len(prefix):])
+                if relpath:
+                    entries.append((relpath, e["sha"], e["url"]))
+        return entries
+
+    def _sync_entries(self, entries, output_dir, cached_files):
+        """Download the listed files whose sha differs from the cache. Returns (file states, number downloaded)."""
+        files, todo = {}, []
+        for relpath, sha, url in entries:
+            local = local_path(output_dir, relpath)
+            cached = cached_files.get(relpath)
+            if cached and cached.get("sha") == sha and os.path.exists(local):
+                files[relpath] = cached
+            else:
+                todo.append((relpath, sha, url, local, cached))
+
+        downloaded = 0
+        if todo:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(todo))) as pool:
+                results = pool.map(lambda job: self._download(*job), todo)
+                for job, (state, changed) in zip(todo, results):
+                    files[job[0]] = state
+                    if changed:
+                        downloaded += 1
+                        print(f"⬇️  Downloaded: {job[0]}")
+        return files, downloaded
+
+    def _sync_tarball(self, response, path, output_dir, cached_files):
+        """Stream the archive and write the .md members under `path` whose content changed."""
+        prefix = f"{path}/" if path else ""
+        files, downloaded = {}, 0
+        response.raw.decode_content = True
+        with tarfile.open(fileobj=response.raw, mode="r|gz") as archive:
+            for member in archive:
+                # members are named <owner>-<repo>-<commit>/<path in repo>
+                name = member.name.split("/", 1)[1] if "/" in member.name else ""
+                if not (member.isfile() and name.startswith(prefix) and name.endswith(".md")):
+                    continue
+                relpath = safe_relpath(name[len(prefix):])
+                if not relpath:
+                    continue
+                data = archive.extractfile(member).read()
+                sha = git_blob_sha(data)
+                local = local_path(output_dir, relpath)
+                files[relpath] = {"sha": sha}
+                if cached_files.get(relpath, {}).get("sha") == sha and os.path.exists(local):
+                    continue
+                write_atomic(local, data)
+                downloaded += 1
+                print(f"⬇️  Extracted: {relpath}")
+        return files, downloaded
+
+    def fetch_directory(self, repo_url, output_dir, mode="contents"):
+        """
+        Mirror the .md files of a GitHub folder into `output_dir`, keeping subfolders in tree and tarball mode.
+        Returns (local paths, number downloaded); local copies of files that left the folder are removed.
+        """
+        if mode not in FETCH_MODES:
+            raise FetchError(f"Unknown fetch mode {mode!r} (expected one of {', '.join(FETCH_MODES)}).")
+        owner, repo, branch, path = parse_tree_url(repo_url)
+        os.makedirs(output_dir, exist_ok=True)
+        cache_path = os.path.join(output_dir, CACHE_NAME)
+        cache = self.load_cache(cache_path)
+        cached_files = cache.get("files", {})
+
+        base = f"{self.api_url}/repos/{owner}/{repo}"
+        listing_url = {
+            "contents": f"{base}/contents/{path}?ref={branch}",
+            "tree": f"{base}/git/trees/{branch}?recursive=1",
+            "tarball": f"{base}/tarball/{branch}",
+        }[mode]
+        source = f"{listing_url}#{path}"
+        same_source = cache.get("source") == source
+        if not same_source:
+            cached_files = {}
+        all_present = all(os.path.exists(local_path(output_dir, relpath)) for relpath in cached_files)
+        listing_etag = cache.get("listing_etag") if same_source and all_present else None
+        response = self.get(listing_url, etag=listing_etag, stream=mode == "tarball")
+        if response.status_code == 304:
+            print(f"⏭️  Unchanged since last fetch ({len(cached_files)} files).")
+            return [local_path(output_dir, relpath) for relpath in sorted(cached_files)], 0
+
+        if mode == "tarball":
+            files, downloaded = self._sync_tarball(response, path, output_dir, cached_files)
+        elif mode == "tree":
+            entries = self._tree_entries(response, path)
+            if entries is None:
+                # files missing from a truncated listing may still exist, so nothing may be deleted based on it
+                print("⚠️  The repository tree is too large for one listing and was truncated; falling back to tarball mode.")
+                response.close()
+                return self.fetch_directory(repo_url, output_dir, mode="tarball")
+            files, downloaded = self._sync_entries(entries, output_dir, cached_files)
+        else:
+            files, downloaded = self._sync_entries(self._contents_entries(response), output_dir, cached_files)
+
+        for relpath in sorted(set(cache.get("files", {})) - set(files)):
+            remove_file(output_dir, relpath)
+            print(f"🗑️  Removed: {relpath} (no longer in the repo)")
+
+        self.save_cache(cache_path, {"source": source, "listing_etag": response.headers.get("ETag"), "files": files})
+        print(f"📊 Fetched {downloaded}, unchanged {len(files) - downloaded}, {self.requests_sent} request(s).")
+        return [local_path(output_dir, relpath) for relpath in sorted(files)], downloaded
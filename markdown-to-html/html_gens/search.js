@@ -0,0 +1,77 @@
+// Client for the sharded index written by search_index.py.
+// Shards are loaded on demand as <script> files, so search also works from file://.
+const searchIndex = (() => {
+  const base = document.currentScript.src.replace(/[^/]*$/, "search/");
+  const loaded = {};
+  const pending = {};
+  let docs = [];
+  // must match STOP_WORDS in search_index.py: those words are never indexed, so a query
+  // term that is one of them would match nothing and empty the whole result
+  const stopWords = new Set(
+    ("a an and are as at be but by for from has have if in into is it its no not of on or " +
+     "so such that the their then there these they this to was were will with you your").split(" ")
+  );
+
+  function load(name) {
+    if (!pending[name]) {
+      pending[name] = new Promise((resolve) => {
+        const script = document.createElement("script");
+        script.src = `${base}${name}.js`;
+        script.onload = () => resolve(loaded[name] || {});
+        script.onerror = () => resolve({});
+        document.head.appendChild(script);
+      });
+    }
+    return pending[name];
+  }
+
+  function tokenize(text) {
+    // same token class as search_index.py: letters, digits and combining marks
+    const terms = text.toLowerCase().normalize("NFC").match(/[\p{L}\p{N}\p{M}]{2,40}/gu) || [];
+    return terms.filter((t) => !stopWords.has(t));
+  }
+
+  function shardKey(term) {
+    // the first two codepoints, as in search_index.py (slice() would count UTF-16 units)
+    return [...term].slice(0, 2).map((c) => (/[a-z0-9]/.test(c) ? c : "_")).join("");
+  }
+
+  function decode(deltas) {
+    let id = 0;
+    return deltas.map((d) => (id += d));
+  }
+
+  async function search(query, limit = 50) {
+    const terms = tokenize(query);
+    if (!terms.length) return [];
+    await load("docs");
+    let matches = null;
+    const exact = new Map(); // doc id -> number of words matched exactly, for ranking
+    for (const [i, term] of terms.entries()) {
+      const shard = await load(`t-${shardKey(term)}`);
+      const prefix = i === terms.length - 1; // the last word may still be being typed
+      const ids = new Set();
+      for (const [t, deltas] of Object.entries(shard)) {
+        if (t !== term && !(prefix && t.startsWith(term))) continue;
+        for (const id of decode(deltas)) {
+          ids.add(id);
+          if (t === term) exact.set(id, (exact.get(id) || 0) + 1);
+        }
+      }
+      matches = matches === null ? ids : new Set([...matches].filter((id) => ids.has(id)));
+      if (!matches.size) break;
+    }
+    return [...matches]
+      .sort((a, b) => (exact.get(b) || 0) - (exact.get(a) || 0) || a - b)
+      .slice(0, limit)
+      .map((id) => ({ path: docs[id][0], title: docs[id][1] }));
+  }
+
+  return {
+    search,
+    tokenize,
+    shardKey,
+    addDocs(list) { docs = list; loaded.docs = list; },
+    addShard(name, terms) { loaded[`t-${name}`] = terms; },
+  };
+})();
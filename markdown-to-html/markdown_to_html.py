@@ -1,108 +1,425 @@
 
+import argparse
+import hashlib
+import itertools
+import json
 import os
-import requests
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from dotenv import load_dotenv
+from github_fetcher import FETCH_MODES, FetchError, GitHubFetcher, local_path, remove_file
+from search_index import STATE_NAME as SEARCH_STATE_NAME, SearchIndex, write_if_changed
+from watcher import watch
 
 load_dotenv()
 
-print("🔍 GITHUB_TOKEN loaded:", os.getenv("GITHUB_TOKEN"))
-
 # Set github_url if you want to fetch markdowns from GitHub, or leave it empty to use local files in "input/markdowns/"
 github_url = "https://github.com/TBoneMendez/cool-data-tools/tree/main/transcirber-app"
 # github_url = ""  # Uncomment to use local mode
 
-def fetch_markdown_files_from_github(repo_url, output_md_dir):
+TEMPLATE_DIR = "./html_gens/"
+TEMPLATES = ("template.html", "static_template.html", "index_template.html")
+# --render client embeds the Markdown for marked.js in the browser; --render server converts it at build time
+PAGE_TEMPLATES = {"client": "template.html", "server": "static_template.html"}
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists", "toc"]
+MERMAID_BLOCK = re.compile(r'<pre><code class="language-mermaid">(.*?)</code></pre>', re.S)
+# Documents listed per index page (index.html, index-2.html, …), grouped by folder
+INDEX_PAGE_SIZE = 200
+INDEX_PAGE = re.compile(r"index(-\d+)?\.html")
+# Kept next to the generated pages: source hashes, template hashes and the indexed file list of the last build
+MANIFEST_NAME = ".manifest.json"
+# Compiled templates, reused across runs and by every worker process
+BYTECODE_CACHE_DIR = "output/.jinja_cache"
+# Below this many pages, starting worker processes costs more than it saves
+PARALLEL_MIN_FILES = 32
+# Pages per pool task, so process round trips don't dominate the cost of rendering small pages
+PAGES_PER_TASK = 16
+# Tasks queued per worker; keeps the pool busy without submitting the whole tree at once
+IN_FLIGHT_PER_WORKER = 4
+
+_environment = None
+_markdown = None
+
+def fetch_markdown_files_from_github(repo_url, output_md_dir, workers=8, mode="contents"):
     token = os.getenv("GITHUB_TOKEN")
     if not token:
         print("❌ Missing GITHUB_TOKEN environment variable.")
         return []
 
-    if "tree" not in repo_url:
-        print("❌ Invalid GitHub URL (must contain 'tree').")
-        return []
-
+    fetcher = GitHubFetcher(token, workers=workers)
     try:
-        parts = repo_url.split("/")
-        owner = parts[3]
-        repo = parts[4]
-        branch = parts[6]
-        path = "/".join(parts[7:])
-
-        api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}?ref={branch}"
-        headers = {"Authorization": f"Bearer {token}", "Accept": "application/vnd.github.v3+json"}
-        response = requests.get(api_url, headers=headers)
-
-        if response.status_code != 200:
-            print(f"❌ Failed to fetch from GitHub: {response.status_code} {response.reason}")
-            return []
-
-        os.makedirs(output_md_dir, exist_ok=True)
-        files_downloaded = []
-
-        for file in response.json():
-            if file["name"].endswith(".md"):
-                file_content = requests.get(file["download_url"], headers=headers).text
-                local_path = os.path.join(output_md_dir, file["name"])
-                with open(local_path, "w", encoding="utf-8") as f:
-                    f.write(file_content)
-                files_downloaded.append(local_path)
-                print(f"⬇️  Downloaded: {file['name']}")
-
-        return files_downloaded
-
+        files, _ = fetcher.fetch_directory(repo_url, output_md_dir, mode=mode)
+        return files
+    except FetchError as e:
+        print(f"❌ Failed to fetch from GitHub: {e}")
+        return []
     except Exception as e:
         print(f"❌ Error: {e}")
         return []
+    finally:
+        fetcher.close()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
 
+def template_hashes():
+    return {name: file_sha256(os.path.join(TEMPLATE_DIR, name)) for name in TEMPLATES}
 
-def convert_md_to_html(input_dir, output_folder):
+
+def load_manifest(output_folder):
+    try:
+        with open(os.path.join(output_folder, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def save_manifest(output_folder, manifest):
     os.makedirs(output_folder, exist_ok=True)
-    files = [f for f in os.listdir(input_dir) if f.endswith(".md")]
-    if not files:
-        print("⚠️  Input folder is empty.")
-        return
+    path = os.path.join(output_folder, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        # one entry per line, without indent, so json uses its C encoder (this runs on every --watch rebuild)
+        f.write(json.dumps(manifest, sort_keys=True, separators=(",", ":")).replace(',"', ',\n"'))
+    os.replace(path + ".tmp", path)
 
-    for filename in files:
-        with open(os.path.join(input_dir, filename), "r", encoding="utf-8") as f:
-            md_content = f.read().replace("\\", "\\\\").replace("`", "\\`").replace("${", "\\${")
 
-        title = filename.replace(".md", "").replace("_", " ").title()
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        env = Environment(loader=FileSystemLoader("./html_gens/"))
-        template = env.get_template("template.html")
+def source_entry(path, previous):
+    """Hash of a source file; the stored hash is reused while size and mtime are unchanged."""
+    stat = os.stat(path)
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+        return previous
+    return {"sha256": file_sha256(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def html_name(md_name):
+    return md_name[:-len(".md")] + ".html"
+
+
+def page_title(path):
+    return os.path.basename(path).replace(".md", "").replace(".html", "").replace("_", " ").title()
+
+
+def list_files(root, suffix):
+    """Relative paths ("guides/setup.md") of the files below `root` ending in `suffix`, skipping hidden folders."""
+    found = []
+    for folder, dirs, names in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        rel = os.path.relpath(folder, root).replace(os.sep, "/")
+        found += [name if rel == "." else f"{rel}/{name}" for name in names if name.endswith(suffix)]
+    return sorted(found)
+
+
+def get_environment():
+    """The Jinja environment of this process, so each template is loaded and compiled once."""
+    global _environment
+    if _environment is None:
+        os.makedirs(BYTECODE_CACHE_DIR, exist_ok=True)
+        _environment = Environment(
+            loader=FileSystemLoader(TEMPLATE_DIR),
+            bytecode_cache=FileSystemBytecodeCache(BYTECODE_CACHE_DIR),
+        )
+    return _environment
+
+
+def get_markdown():
+    """The Markdown converter of this process (reset between documents rather than rebuilt)."""
+    global _markdown
+    if _markdown is None:
+        import markdown
+        _markdown = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    return _markdown
+
+
+def markdown_to_static_html(md_text):
+    """(html, has_mermaid): the document as HTML, with mermaid code blocks turned into <pre class="mermaid">."""
+    converter = get_markdown()
+    html = converter.reset().convert(md_text)
+    html, diagrams = MERMAID_BLOCK.subn(r'<pre class="mermaid">\1</pre>', html)
+    return html, diagrams > 0
+
+
+def warm_worker(render="client"):
+    get_environment().get_template(PAGE_TEMPLATES[render])
+    if render == "server":
+        get_markdown()
+
+
+def render_page(md_path, output_path, render="client"):
+    title = page_title(md_path)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    template = get_environment().get_template(PAGE_TEMPLATES[render])
+    with open(md_path, "r", encoding="utf-8") as f:
+        md_text = f.read()
+
+    if render == "server":
+        content, has_mermaid = markdown_to_static_html(md_text)
+        html_content = template.render(
+            title=title,
+            content=content,
+            has_mermaid=has_mermaid,
+            timestamp=timestamp
+        )
+    else:
+        md_content = md_text.replace("\\", "\\\\").replace("`", "\\`").replace("${", "\\${")
         html_content = template.render(
             title=title,
             markdown=md_content,
             timestamp=timestamp
         )
 
-        output_path = os.path.join(output_folder, filename.replace(".md", ".html"))
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(html_content)
+    return md_path, output_path
+
+
+def render_batch(jobs):
+    return [render_page(*job) for job in jobs]
+
+
+def render_pages(jobs, workers, render="client"):
+    """Render (md_path, output_path, render) jobs, yielding each as it finishes; large batches go to a process pool."""
+    if workers <= 1 or len(jobs) < PARALLEL_MIN_FILES:
+        for job in jobs:
+            yield render_page(*job)
+        return
+
+    max_in_flight = workers * IN_FLIGHT_PER_WORKER
+    todo = iter(jobs)
+    batches = iter(lambda: list(itertools.islice(todo, PAGES_PER_TASK)), [])
+    pending = set()
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_worker, initargs=(render,)) as pool:
+        while True:
+            for batch in itertools.islice(batches, max_in_flight - len(pending)):
+                pending.add(pool.submit(render_batch, batch))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
 
-        print(f"✅ Converted: {filename} → {output_path}")
+def convert_md_to_html(input_dir, output_folder, manifest, force=False, workers=1, render="client", changed=None):
+    """
+    Render the .md files whose content (or the page template) changed since the
+    build recorded in `manifest`, and delete pages whose source is gone.
+    Updates `manifest` in place and returns counts of built, skipped, added and removed files.
+
+    `changed` (relative paths) limits the work to those files; the rest are taken
+    from the manifest without touching the disk. Used by --watch.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    old_sources = manifest.get("sources", {})
+    if changed is None:
+        files = list_files(input_dir, ".md")
+    else:
+        present = {p for p in changed if p.endswith(".md") and os.path.isfile(local_path(input_dir, p))}
+        files = sorted((set(old_sources) - set(changed)) | present)
+    templates = template_hashes()
+    page_template = PAGE_TEMPLATES[render]
+    rebuild_all = (force or manifest.get("render", "client") != render
+                   or manifest.get("templates", {}).get(page_template) != templates[page_template])
+    if rebuild_all and old_sources and not force:
+        print(f"🎨 Page template or render mode changed, rebuilding every page ({render} rendering).")
+
+    sources = {}
+    jobs = []
+    skipped = removed = 0
+    for filename in files:
+        previous = old_sources.get(filename)
+        if changed is not None and filename not in changed and previous and not rebuild_all:
+            sources[filename] = previous
+            skipped += 1
+            continue
+        md_path = local_path(input_dir, filename)
+        entry = source_entry(md_path, previous)
+        sources[filename] = entry
+        output_path = local_path(output_folder, html_name(filename))
+        if not rebuild_all and previous and previous["sha256"] == entry["sha256"] and os.path.exists(output_path):
+            skipped += 1
+            continue
+        jobs.append((md_path, output_path, render))
+
+    built = 0
+    for md_path, output_path in render_pages(jobs, workers, render):
+        built += 1
+        print(f"✅ Converted: {os.path.relpath(md_path, input_dir)} → {output_path}")
+
+    for filename in old_sources:
+        if filename not in sources:
+            remove_file(output_folder, html_name(filename))
+            removed += 1
+            print(f"🗑️  Removed: {local_path(output_folder, html_name(filename))} (source deleted)")
+
+    manifest["sources"] = sources
+    manifest["templates"] = templates
+    manifest["render"] = render
+    if not files:
+        print("⚠️  Input folder is empty.")
+    print(f"📊 Built {built}, skipped {skipped} unchanged, removed {removed}.")
+    return {"built": built, "skipped": skipped, "added": len(sources.keys() - old_sources.keys()), "removed": removed}
 
 
-def generate_index_html(output_folder):
-    env = Environment(loader=FileSystemLoader("./html_gens/"))
-    template = env.get_template("index_template.html")
+def index_page_name(number):
+    return "index.html" if number == 1 else f"index-{number}.html"
 
-    html_files = sorted(
-        f for f in os.listdir(output_folder)
-        if f.endswith(".html") and f != "index.html"
-    )
 
-    html_output = template.render(files=html_files)
+def generate_index_html(output_folder, manifest, force=False):
+    """
+    Rewrite the index pages only when the page list or the index template changed.
+    Documents are sorted by path, split into pages of INDEX_PAGE_SIZE and grouped by folder.
+    """
+    html_files = [f for f in list_files(output_folder, ".html") if not INDEX_PAGE.fullmatch(f)]
     index_path = os.path.join(output_folder, "index.html")
-    with open(index_path, "w", encoding="utf-8") as f:
-        f.write(html_output)
+    index_state = {
+        "template": file_sha256(os.path.join(TEMPLATE_DIR, "index_template.html")),
+        "page_size": INDEX_PAGE_SIZE,
+        "files": html_files,
+    }
+    if not force and manifest.get("index") == index_state and os.path.exists(index_path):
+        print(f"⏭️  Index unchanged: {index_path}")
+        return
+
+    template = get_environment().get_template("index_template.html")
+    chunks = [html_files[i:i + INDEX_PAGE_SIZE] for i in range(0, len(html_files), INDEX_PAGE_SIZE)] or [[]]
+    pages = [index_page_name(n) for n in range(1, len(chunks) + 1)]
+    for number, chunk in enumerate(chunks, start=1):
+        groups = {}
+        for path in chunk:
+            groups.setdefault(os.path.dirname(path), []).append({"path": path, "title": page_title(path)})
+        html_output = template.render(groups=list(groups.items()), page=number, pages=pages, total=len(html_files))
+        with open(os.path.join(output_folder, pages[number - 1]), "w", encoding="utf-8") as f:
+            f.write(html_output)
+    for name in os.listdir(output_folder):
+        if INDEX_PAGE.fullmatch(name) and name not in pages:
+            os.remove(os.path.join(output_folder, name))
+    manifest["index"] = index_state
+
+    extra = f" (+{len(pages) - 1} more page(s))" if len(pages) > 1 else ""
+    print(f"📄 Created index file: {index_path}{extra}")
+
+
+def sources_digest(manifest):
+    sources = sorted((path, entry["sha256"]) for path, entry in manifest.get("sources", {}).items())
+    return hashlib.sha256(json.dumps(sources).encode("utf-8")).hexdigest()
+
+
+def update_search_index(input_dir, output_folder, manifest, force=False, index=None, persist=True):
+    """
+    Re-index the sources that changed since the last build and rewrite the search shards that differ.
+    Returns the index so --watch can keep it in memory and pass it back as `index`.
+
+    With persist=False the index state is not saved and the manifest keeps its previous
+    search digest, so if the state is never saved, the next run re-indexes the changed documents.
+    """
+    sources = {path: entry["sha256"] for path, entry in manifest.get("sources", {}).items()}
+    with open(os.path.join(TEMPLATE_DIR, "search.js"), "r", encoding="utf-8") as f:
+        write_if_changed(os.path.join(output_folder, "search.js"), f.read())
+    digest = sources_digest(manifest)
+    if not force and manifest.get("search") == digest and os.path.exists(os.path.join(output_folder, SEARCH_STATE_NAME)):
+        print("⏭️  Search index unchanged.")
+        return index
+
+    if force:
+        index = SearchIndex()
+    elif index is None:
+        index = SearchIndex.load(output_folder)
+
+    def read_text(path):
+        with open(local_path(input_dir, path), "r", encoding="utf-8") as f:
+            return f.read()
+
+    indexed, removed = index.update(sources, read_text, page_title)
+    written = index.write(output_folder, html_name)
+    if persist:
+        index.save(output_folder)
+        manifest["search"] = digest
+    print(f"🔎 Search index: indexed {indexed}, removed {removed}, wrote {written} file(s).")
+    return index
+
+
+def build_site(source_dir, output_folder, manifest, args, force=False, changed=None, search=None, persist=True):
+    """One incremental build: pages, index (unless `changed` shows the file set is the same) and search index."""
+    summary = convert_md_to_html(source_dir, output_folder, manifest, force=force, workers=args.workers,
+                                 render=args.render, changed=changed)
+    if changed is None or summary["added"] or summary["removed"]:
+        generate_index_html(output_folder, manifest, force=force)
+    search = update_search_index(source_dir, output_folder, manifest, force=force, index=search, persist=persist)
+    save_manifest(output_folder, manifest)
+    return search
+
+
+def watch_and_rebuild(source_dir, output_folder, manifest, args, search=None):
+    """
+    Rebuild on every change below `source_dir` or the templates, keeping the manifest and search index
+    in memory. The search index state is only written to disk when watching stops; if the process dies
+    before that, SearchIndex.load sees shards newer than the state and rebuilds the index on the next run.
+    """
+    state = {"search": search or SearchIndex.load(output_folder)}
+
+    def on_change(changes):
+        started = time.perf_counter()
+        sources = {path for root, path in changes if root == "sources"}
+        templates_changed = any(root == "templates" for root, _ in changes)
+        print(f"\n🔄 {len(changes)} change(s): {', '.join(sorted(path for _, path in changes)[:5])}")
+        try:
+            state["search"] = build_site(source_dir, output_folder, manifest, args,
+                                         changed=None if templates_changed else sources, search=state["search"],
+                                         persist=False)
+        except Exception as e:
+            print(f"❌ Rebuild failed: {e}")
+            return
+        print(f"⚡ Rebuilt in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    roots = {"sources": (source_dir, (".md",)), "templates": (TEMPLATE_DIR, None)}
+    watch(roots, on_change, debounce=args.debounce_ms / 1000, interval=args.poll_ms / 1000)
+    state["search"].save(output_folder)
+    manifest["search"] = sources_digest(manifest)
+    save_manifest(output_folder, manifest)
+
 
-    print(f"📄 Created index file: {index_path}")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert Markdown files to HTML pages with an index.")
+    parser.add_argument("--force", action="store_true", help="Rebuild every page and the index, ignoring the build manifest")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes rendering pages in parallel (default: CPU count; 1 renders in this process)")
+    parser.add_argument("--render", choices=tuple(PAGE_TEMPLATES), default="client",
+                        help="'client': pages parse the Markdown in the browser with marked.js; 'server': convert it to "
+                             "static HTML at build time, loading mermaid only on pages with diagrams (default: client)")
+    parser.add_argument("--watch", action="store_true",
+                        help="After building, keep running and rebuild the affected pages whenever a source or template changes")
+    parser.add_argument("--debounce-ms", type=int, default=50,
+                        help="With --watch: wait for this many quiet milliseconds before rebuilding a burst of changes (default: 50)")
+    parser.add_argument("--poll-ms", type=int, default=200,
+                        help="With --watch and without the watchdog package: scan interval in milliseconds (default: 200)")
+    parser.add_argument("--fetch-mode", choices=FETCH_MODES, default="contents",
+                        help="GitHub fetch: 'contents' (one folder, a request per file), 'tree' (whole subtree in one "
+                             "listing call) or 'tarball' (one archive download) (default: contents)")
+    parser.add_argument("--fetch-workers", type=int, default=8,
+                        help="Concurrent downloads when fetching from GitHub (default: 8)")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
+    args = parse_args()
+    if args.render == "server":
+        try:
+            import markdown  # noqa: F401
+        except ImportError:
+            print("❌ --render server needs the markdown package: pip install markdown")
+            sys.exit(1)
+    print("🔍 GITHUB_TOKEN loaded:", os.getenv("GITHUB_TOKEN"))
     input_dir = "input/markdowns"
     os.makedirs(input_dir, exist_ok=True)
     output_md_dir = "output/markdowns"
@@ -111,7 +428,7 @@ if __name__ == "__main__":
 
     if github_url:
         print(f"🌐 Fetching markdown-files from: {github_url}")
-        downloaded = fetch_markdown_files_from_github(github_url, output_md_dir)
+        downloaded = fetch_markdown_files_from_github(github_url, output_md_dir, workers=args.fetch_workers, mode=args.fetch_mode)
         source_dir = output_md_dir if downloaded else ""
         if not downloaded:
             print("⚠️  No markdown files found via GitHub URL.")
@@ -120,7 +437,9 @@ if __name__ == "__main__":
         source_dir = input_dir
 
     if source_dir:
-        convert_md_to_html(source_dir, output_html_dir)
-        generate_index_html(output_html_dir)
+        manifest = load_manifest(output_html_dir)
+        search = build_site(source_dir, output_html_dir, manifest, args, force=args.force)
+        if args.watch:
+            watch_and_rebuild(source_dir, output_html_dir, manifest, args, search)
     else:
         print("❌ No markdown files found to convert.")
@@ -0,0 +1,227 @@
+"""
+Sharded inverted search index for the generated site.
+
+Every document gets a stable numeric ID, and terms are grouped into shards by
+their first two characters. Each shard maps term -> delta-encoded sorted doc
+IDs, so the search box only downloads the shards of the words typed. Shards
+are small JavaScript files (`searchIndex.addShard(...)`) rather than bare JSON,
+so search also works when the site is opened from disk (file://).
+
+The shard files are the index; the state file remembers each document's ID,
+content hash and terms. Updating a changed document re-reads and rewrites just
+the shards where its terms differ, so a one-word edit touches one or two files.
+"""
+import gzip
+import json
+import os
+import re
+import unicodedata
+
+SEARCH_DIR = "search"
+STATE_NAME = ".search_state.json.gz"
+STATE_VERSION = 2  # bumped whenever tokenizing changes, so older states are rebuilt
+
+
+def mark_class():
+    """Regex class body matching the Unicode combining marks (category M), which \\w leaves out."""
+    # marks only occur in planes 0, 1 and 14
+    codepoints = [c for plane in (0, 1, 14) for c in range(plane << 16, (plane + 1) << 16)
+                  if unicodedata.category(chr(c))[0] == "M"]
+    ranges, start = [], codepoints[0]
+    for prev, c in zip(codepoints, codepoints[1:] + [None]):
+        if c != prev + 1:
+            ranges.append(f"\\U{start:08x}-\\U{prev:08x}" if start != prev else f"\\U{start:08x}")
+            start = c
+    return "".join(ranges)
+
+
+# letters, digits and combining marks: the same class as search.js ([\p{L}\p{N}\p{M}])
+TOKEN = re.compile(f"(?:[^\\W_]|[{mark_class()}]){{2,40}}")
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have if in into is it its no not of on or "
+    "so such that the their then there these they this to was were will with you your".split()
+)
+
+
+def tokenize(text):
+    return {t for t in TOKEN.findall(unicodedata.normalize("NFC", text.lower())) if t not in STOP_WORDS}
+
+
+def shard_key(term):
+    """
+    Shard name from the first two characters (codepoints, like search.js); characters that
+    aren't ASCII letters or digits become '_'.
+    """
+    key = term[:2]
+    if key.isascii() and key.isalnum():
+        return key
+    return "".join(c if c.isascii() and c.isalnum() else "_" for c in key)
+
+
+def shard_terms(terms):
+    """{shard key: set of terms}."""
+    by_key = {}
+    for term in terms:
+        by_key.setdefault(shard_key(term), set()).add(term)
+    return by_key
+
+
+def delta_encode(ids):
+    ids = sorted(ids)
+    return [b - a for a, b in zip([0] + ids, ids)]
+
+
+def delta_decode(deltas):
+    ids, total = [], 0
+    for d in deltas:
+        total += d
+        ids.append(total)
+    return ids
+
+
+def write_if_changed(path, text):
+    """Write `text` unless the file already holds it. Returns True if written."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return True
+
+
+class SearchIndex:
+    def __init__(self, docs=None):
+        self.docs = docs or {}  # path -> {"id", "sha256", "title", "terms": space-separated terms}
+        self.rebuild = not self.docs  # write every shard from scratch instead of patching the files
+        self.pending = {}  # shard key -> {doc id: terms of that doc in the shard (empty to remove)}
+        self.shards = {}  # shard key -> {term: [doc ids]}, shards read or written this session
+        self.docs_changed = False
+
+    @classmethod
+    def load(cls, output_folder):
+        """
+        The saved index, or an empty one (which rebuilds every shard) if there is none or it is out of date.
+        A state older than any shard file means shards were written after the last save (e.g. the process
+        was killed during --watch); its doc IDs may no longer match the shards, so it can't be trusted.
+        """
+        path = os.path.join(output_folder, STATE_NAME)
+        try:
+            saved = os.stat(path).st_mtime_ns
+            with os.scandir(os.path.join(output_folder, SEARCH_DIR)) as entries:
+                if any(entry.stat().st_mtime_ns > saved for entry in entries):
+                    print("⚠️  Search shards are newer than the saved index state; rebuilding the search index.")
+                    return cls()
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") != STATE_VERSION:
+                return cls()
+            return cls(state["docs"])
+        except (OSError, ValueError, KeyError):
+            return cls()
+
+    def save(self, output_folder):
+        path = os.path.join(output_folder, STATE_NAME)
+        with gzip.open(path + ".tmp", "wt", encoding="utf-8", compresslevel=1) as f:
+            f.write(json.dumps({"version": STATE_VERSION, "docs": self.docs}, separators=(",", ":")))
+        os.replace(path + ".tmp", path)
+
+    def _queue(self, doc_id, old_terms, new_terms):
+        """Queue the shards where this document's terms changed."""
+        old_by_key, new_by_key = shard_terms(old_terms), shard_terms(new_terms)
+        for key in old_by_key.keys() | new_by_key.keys():
+            if old_by_key.get(key) != new_by_key.get(key):
+                self.pending.setdefault(key, {})[doc_id] = new_by_key.get(key, set())
+
+    def update(self, sources, read_text, title_of):
+        """
+        Re-tokenize the documents in `sources` (path -> content hash) that are new or changed
+        and forget the ones that are gone. Returns (documents indexed, documents removed).
+        """
+        removed = [path for path in self.docs if path not in sources]
+        for path in removed:
+            doc = self.docs.pop(path)
+            self._queue(doc["id"], doc["terms"].split(), ())
+        used = {doc["id"] for doc in self.docs.values()}
+        free = (i for i in range(len(self.docs) + len(sources) + 1) if i not in used)
+
+        indexed = 0
+        for path, sha in sources.items():
+            doc = self.docs.get(path)
+            if doc and doc["sha256"] == sha:
+                continue
+            title = title_of(path)
+            terms = tokenize(f"{title} {path} {read_text(path)}")
+            doc_id = doc["id"] if doc else next(free)
+            self._queue(doc_id, doc["terms"].split() if doc else (), terms)
+            self.docs_changed |= doc is None or doc["title"] != title
+            self.docs[path] = {
+                "id": doc_id,
+                "sha256": sha,
+                "title": title,
+                "terms": " ".join(sorted(terms)),
+            }
+            indexed += 1
+        self.docs_changed |= bool(removed)
+        return indexed, len(removed)
+
+    def _read_shard(self, folder, key):
+        if key in self.shards:
+            return self.shards[key]
+        postings = {}
+        if not self.rebuild:
+            try:
+                with open(os.path.join(folder, f"t-{key}.js"), "r", encoding="utf-8") as f:
+                    text = f.read()
+                payload = json.loads(text[text.index(",") + 1:text.rindex(")")])
+                postings = {term: delta_decode(deltas) for term, deltas in payload.items()}
+            except (OSError, ValueError):
+                pass
+        self.shards[key] = postings
+        return postings
+
+    def write(self, output_folder, link_of):
+        """Write the queued shard changes (and docs.js if the document list changed). Returns files written."""
+        folder = os.path.join(output_folder, SEARCH_DIR)
+        os.makedirs(folder, exist_ok=True)
+        written = 0
+        if self.docs_changed or self.rebuild or not os.path.exists(os.path.join(folder, "docs.js")):
+            doc_list = [None] * (max((d["id"] for d in self.docs.values()), default=-1) + 1)
+            for path, doc in self.docs.items():
+                doc_list[doc["id"]] = [link_of(path), doc["title"]]
+            written += write_if_changed(
+                os.path.join(folder, "docs.js"),
+                f"searchIndex.addDocs({json.dumps(doc_list, ensure_ascii=False, separators=(',', ':'))});\n",
+            )
+
+        for key, updates in self.pending.items():
+            postings = self._read_shard(folder, key)
+            for term in list(postings):
+                ids = [i for i in postings[term] if i not in updates]
+                if ids:
+                    postings[term] = ids
+                else:
+                    del postings[term]
+            for doc_id, terms in updates.items():
+                for term in terms:
+                    postings.setdefault(term, []).append(doc_id)
+            path = os.path.join(folder, f"t-{key}.js")
+            if not postings:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            payload = {term: delta_encode(ids) for term, ids in sorted(postings.items())}
+            written += write_if_changed(
+                path, f'searchIndex.addShard("{key}",{json.dumps(payload, ensure_ascii=False, separators=(",", ":"))});\n'
+            )
+
+        if self.rebuild:
+            for name in os.listdir(folder):
+                if name.startswith("t-") and name[2:-3] not in self.pending:
+                    os.remove(os.path.join(folder, name))
+        self.pending = {}
+        self.rebuild = False
+        self.docs_changed = False
+        return written
@@ -0,0 +1,83 @@
+"""
+search.js must split queries into exactly the terms search_index.py indexes:
+a query term that never appears in the index makes the whole search come back empty.
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from search_index import SearchIndex, shard_key, tokenize  # noqa: E402
+
+SAMPLES = [
+    "state of the art",
+    "the art",
+    "welcome to the gallery",
+    "Café café CAFÉ",
+    "Café naïve résumé",  # decomposed accents
+    "中文字 日本語のテキスト",
+    "😀emoji 𠀀𠀁ext 𝐀𝐁bold",
+    "under_score a1 b2 x y z",
+    "It is what it is, and that is that.",
+    "हिन्दी ภาษาไทย עברית العربية",
+]
+
+# loads search.js with just enough of a DOM to build the searchIndex object
+NODE_SCRIPT = """
+const fs = require("fs");
+global.document = { currentScript: { src: "" } };
+eval(fs.readFileSync(process.argv[1], "utf8") + ";global.searchIndex = searchIndex;");
+const samples = JSON.parse(fs.readFileSync(0, "utf8"));
+console.log(JSON.stringify(samples.map((s) => searchIndex.tokenize(s).map((t) => [t, searchIndex.shardKey(t)]))));
+"""
+
+
+def js_tokens(samples):
+    script = os.path.join(ROOT, "html_gens", "search.js")
+    result = subprocess.run(
+        ["node", "-e", NODE_SCRIPT, script],
+        input=json.dumps(samples), capture_output=True, text=True, encoding="utf-8", check=True,
+    )
+    return json.loads(result.stdout)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_search_js_tokenizes_like_the_index():
+    for sample, pairs in zip(SAMPLES, js_tokens(SAMPLES)):
+        assert {t for t, _ in pairs} == tokenize(sample), sample
+        assert {k for _, k in pairs} == {shard_key(t) for t in tokenize(sample)}, sample
+
+
+def test_stop_words_are_not_indexed():
+    assert tokenize("state of the art") == {"state", "art"}
+
+
+def build(folder, texts, index=None):
+    index = index or SearchIndex()
+    index.update({path: str(hash(text)) for path, text in texts.items()}, texts.get, lambda path: path)
+    index.write(folder, lambda path: path)
+    return index
+
+
+def test_saved_state_is_reused(tmp_path):
+    build(str(tmp_path), {"a.md": "alpha"}).save(str(tmp_path))
+    assert SearchIndex.load(str(tmp_path)).docs.keys() == {"a.md"}
+
+
+def test_state_older_than_the_shards_is_rebuilt(tmp_path):
+    folder = str(tmp_path)
+    index = build(folder, {"a.md": "alpha"})
+    index.save(folder)
+    state = os.path.join(folder, ".search_state.json.gz")
+    os.utime(state, ns=(0, 0))
+    # shards written after the last save, as when --watch is killed before it saves on exit
+    build(folder, {"a.md": "alpha", "b.md": "beta"}, index)
+
+    reloaded = SearchIndex.load(folder)
+    assert reloaded.rebuild and not reloaded.docs
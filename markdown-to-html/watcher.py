@@ -0,0 +1,123 @@
+"""
+File watching for --watch.
+
+Uses watchdog for native filesystem events when it is installed and falls
+back to polling (diffing size + mtime snapshots) otherwise. Changes are
+reported as (root name, relative path) pairs. Bursts of events, such as an
+editor's save-and-rename or a `git checkout`, are debounced into one batch.
+"""
+import os
+import queue
+import time
+
+
+def snapshot(root, suffixes):
+    """{relative path: (size, mtime_ns)} of the files below `root`, skipping hidden folders."""
+    state = {}
+    for folder, dirs, names in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        rel = os.path.relpath(folder, root).replace(os.sep, "/")
+        for name in names:
+            if suffixes and not name.endswith(suffixes):
+                continue
+            path = os.path.join(folder, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            state[name if rel == "." else f"{rel}/{name}"] = (stat.st_size, stat.st_mtime_ns)
+    return state
+
+
+class PollingWatcher:
+    def __init__(self, roots, interval=0.2):
+        self.roots = roots  # name -> (path, suffixes)
+        self.interval = interval
+        self.state = {name: snapshot(path, suffixes) for name, (path, suffixes) in roots.items()}
+
+    def poll(self, timeout):
+        """Changed (root, path) pairs, waiting up to `timeout` seconds for the next scan."""
+        time.sleep(min(timeout, self.interval))
+        changes = set()
+        for name, (path, suffixes) in self.roots.items():
+            old, new = self.state[name], snapshot(path, suffixes)
+            changes |= {(name, p) for p in old.keys() ^ new.keys()}
+            changes |= {(name, p) for p in old.keys() & new.keys() if old[p] != new[p]}
+            self.state[name] = new
+        return changes
+
+    def close(self):
+        pass
+
+
+class WatchdogWatcher:
+    def __init__(self, roots):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        self.events = queue.Queue()
+        self.observer = Observer()
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def __init__(self, name, root, suffixes):
+                self.name, self.root, self.suffixes = name, os.path.abspath(root), suffixes
+
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                for path in (event.src_path, getattr(event, "dest_path", "")):
+                    rel = os.path.relpath(path, self.root).replace(os.sep, "/") if path else ""
+                    if rel and not rel.startswith("..") and (not self.suffixes or rel.endswith(self.suffixes)):
+                        if not any(part.startswith(".") for part in rel.split("/")[:-1]):
+                            watcher.events.put((self.name, rel))
+
+        for name, (path, suffixes) in roots.items():
+            self.observer.schedule(Handler(name, path, suffixes), path, recursive=True)
+        self.observer.start()
+
+    def poll(self, timeout):
+        changes = set()
+        try:
+            changes.add(self.events.get(timeout=timeout))
+            while True:
+                changes.add(self.events.get_nowait())
+        except queue.Empty:
+            pass
+        return changes
+
+    def close(self):
+        self.observer.stop()
+        self.observer.join()
+
+
+def make_watcher(roots, interval=0.2):
+    try:
+        return WatchdogWatcher(roots), "watchdog"
+    except ImportError:
+        return PollingWatcher(roots, interval), f"polling every {interval * 1000:.0f} ms"
+
+
+def watch(roots, on_change, debounce=0.05, interval=0.2):
+    """
+    Call `on_change(changes)` for every debounced batch of changes below `roots`
+    (name -> (path, suffixes or None)) until interrupted.
+    """
+    watcher, kind = make_watcher(roots, interval)
+    print(f"👀 Watching {', '.join(path for path, _ in roots.values())} ({kind}). Press Ctrl+C to stop.")
+    try:
+        while True:
+            changes = watcher.poll(1.0)
+            if not changes:
+                continue
+            # keep collecting until the burst has been quiet for `debounce` seconds
+            while True:
+                more = watcher.poll(debounce)
+                if not more:
+                    break
+                changes |= more
+            on_change(changes)
+    except KeyboardInterrupt:
+        print("👋 Stopped watching.")
+    finally:
+        watcher.close()
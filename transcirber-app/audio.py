@@ -0,0 +1,50 @@
+"""
+Decode-once audio for Whisper.
+
+Every input (audio or video) is decoded by a single ffmpeg pass straight into
+the format Whisper works on: 16 kHz mono float32 samples, stored as raw PCM in
+converted/<name>.pcm. The file is memory-mapped and passed to model.transcribe
+as an array, so later passes (such as the English translation) don't decode
+again. The duration comes from the sample count, so no separate probe is needed.
+"""
+import os
+import threading
+
+import ffmpeg
+import numpy as np
+
+SAMPLE_RATE = 16000  # what Whisper expects
+AUDIO_EXTENSIONS = [".mp3", ".wav", ".m4a"]
+VIDEO_EXTENSIONS = [".mp4", ".mov", ".mkv", ".webm"]
+
+
+def decode_to_pcm(input_path, pcm_path):
+    """Decode `input_path` to 16 kHz mono float32 PCM at `pcm_path`. Returns True on success."""
+    tmp = f"{pcm_path}.{threading.get_ident()}.tmp"  # two inputs with the same content may decode at once
+    try:
+        (
+            ffmpeg.input(input_path)
+            .output(tmp, format="f32le", acodec="pcm_f32le", ac=1, ar=SAMPLE_RATE)
+            .overwrite_output()
+            .run(quiet=True)
+        )
+    except ffmpeg.Error as e:
+        stderr = e.stderr.decode("utf-8", "replace").strip().splitlines() if e.stderr else []
+        print(f"❌ Error decoding '{input_path}': {stderr[-1] if stderr else e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return False
+    # renamed only once complete, so an interrupted run never leaves a truncated file to reuse
+    os.replace(tmp, pcm_path)
+    return True
+
+
+def load_pcm(pcm_path):
+    """The samples of a decoded file as a memory-mapped float32 array (copy-on-write, so torch can wrap it)."""
+    if os.path.getsize(pcm_path) == 0:
+        return np.zeros(0, dtype=np.float32)
+    return np.memmap(pcm_path, dtype=np.float32, mode="c")
+
+
+def duration_seconds(audio):
+    return len(audio) / SAMPLE_RATE
@@ -0,0 +1,110 @@
+"""
+Process-wide registry of the Whisper and MarianMT models.
+
+Each model is loaded from disk once per process and handed out again on every
+later request, so a batch of files pays the load time once instead of once per
+file and language. Models are kept in least-recently-used order; when a memory
+budget is set and a newly loaded model pushes the total over it, the models
+that have gone unused the longest are dropped until it fits again (the model
+just loaded is always kept, even if it alone exceeds the budget).
+"""
+import gc
+import threading
+from collections import OrderedDict
+
+import whisper
+from transformers import MarianMTModel, MarianTokenizer
+
+MARIAN_MODELS = {
+    "no": "Neurora/opus-tatoeba-eng-nor-bt",
+    "sv": "Helsinki-NLP/opus-mt-en-sv",
+}
+
+
+def model_size_mb(model):
+    """Memory held by a torch model's parameters and buffers, in MB."""
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors) / 2**20
+
+
+def load_whisper(name):
+    model = whisper.load_model(name)
+    return model, model_size_mb(model)
+
+
+def load_marian(target_lang):
+    if target_lang not in MARIAN_MODELS:
+        raise ValueError(f"Unsupported target language: {target_lang}")
+    model_name = MARIAN_MODELS[target_lang]
+    tokenizer = MarianTokenizer.from_pretrained(model_name)
+    model = MarianMTModel.from_pretrained(model_name)
+    model.eval()
+    return (tokenizer, model), model_size_mb(model)
+
+
+LOADERS = {
+    "whisper": load_whisper,
+    "marian": load_marian,
+}
+
+
+class ModelRegistry:
+    def __init__(self, budget_mb=None):
+        self.budget_mb = budget_mb  # None or 0 = no limit
+        self._models = OrderedDict()  # (kind, name) -> (model, size in MB), least recently used first
+        self._lock = threading.RLock()
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, kind, name):
+        """The loaded model for (kind, name), loading it on first use."""
+        key = (kind, name)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key][0]
+            print(f"📦 Loading {kind} model '{name}' ...")
+            model, size = LOADERS[kind](name)
+            self._models[key] = (model, size)
+            self.loads += 1
+            self._evict(keep=key)
+            return model
+
+    def whisper(self, name):
+        return self.get("whisper", name)
+
+    def marian(self, target_lang):
+        """(tokenizer, model) translating English into `target_lang`."""
+        return self.get("marian", target_lang)
+
+    def preload(self, specs):
+        """Load every (kind, name) in `specs` up front."""
+        for kind, name in specs:
+            self.get(kind, name)
+
+    def used_mb(self):
+        with self._lock:
+            return sum(size for _, size in self._models.values())
+
+    def _evict(self, keep):
+        if not self.budget_mb:
+            return
+        evicted = False
+        while self.used_mb() > self.budget_mb:
+            key = next((k for k in self._models if k != keep), None)
+            if key is None:
+                break
+            _, size = self._models.pop(key)
+            self.evictions += 1
+            evicted = True
+            print(f"♻️ Unloaded {key[0]} model '{key[1]}' ({size:.0f} MB) to stay within {self.budget_mb} MB.")
+        if evicted:
+            gc.collect()
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+        gc.collect()
+
+
+REGISTRY = ModelRegistry()
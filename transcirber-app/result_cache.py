@@ -0,0 +1,138 @@
+"""
+Content-addressed cache for decoded audio and transcription/translation results.
+
+Inputs are identified by the SHA-256 of their content, not their file name:
+decoded audio is stored as converted/<source hash>.pcm, so a changed file is
+decoded again even under the same name and a renamed copy reuses the earlier
+decode. Whisper and Marian results are stored as cache/results/<key>.json, where
+the key hashes the source hash together with the model, language and task (and
+any option that changes the result), so a repeated run skips every stage whose
+inputs are unchanged.
+
+Source hashes are remembered by path, size and modification time, so unchanged
+inputs aren't re-read on every run. Files are touched when reused, and
+`evict` deletes the least recently used ones once the total exceeds the budget.
+"""
+import hashlib
+import json
+import os
+import threading
+
+RESULTS_DIR = "results"
+SOURCES_NAME = "sources.json"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_atomic(path, text):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def touch(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+class SourceHashes:
+    """Content hashes of input files, remembered by (size, mtime) between runs."""
+
+    def __init__(self, cache_dir):
+        self.path = os.path.join(cache_dir, SOURCES_NAME)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.known = json.load(f)
+        except (OSError, ValueError):
+            self.known = {}
+
+    def sha256(self, path):
+        stat = os.stat(path)
+        with self._lock:
+            entry = self.known.get(path)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha256"]
+        sha = file_sha256(path)
+        with self._lock:
+            self.known[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha}
+        return sha
+
+    def save(self):
+        with self._lock:
+            known = {path: entry for path, entry in self.known.items() if os.path.exists(path)}
+        write_atomic(self.path, json.dumps(known, indent=2, sort_keys=True))
+
+
+class ResultCache:
+    def __init__(self, cache_dir, force=False):
+        self.folder = os.path.join(cache_dir, RESULTS_DIR)
+        self.force = force  # recompute everything (results are still stored for the next run)
+        os.makedirs(self.folder, exist_ok=True)
+
+    @staticmethod
+    def key(**fields):
+        """Cache key for a result that depends exactly on `fields` (source hash, model, language, task, ...)."""
+        return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.folder, f"{key}.json")
+
+    def get(self, key):
+        """The stored result for `key`, or None (always None with force)."""
+        if self.force:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        touch(path)
+        return result
+
+    def put(self, key, result):
+        write_atomic(self._path(key), json.dumps(result, ensure_ascii=False))
+
+
+def evict(folders, max_bytes):
+    """
+    Delete the least recently used files in `folders` until they take at most `max_bytes`.
+    Returns (files deleted, bytes freed).
+    """
+    files = []
+    for folder in folders:
+        if not os.path.isdir(folder):
+            continue
+        for root, _, names in os.walk(folder):
+            for name in names:
+                if name == SOURCES_NAME or name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+    deleted, freed = 0, 0
+    for _, size, path in sorted(files):
+        if total - freed <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        deleted += 1
+        freed += size
+    return deleted, freed
@@ -0,0 +1,146 @@
+"""
+Segmented transcription of long recordings, with checkpoints and resume.
+
+The audio is cut into windows of roughly --window-minutes, each cut placed at
+the quietest half second shortly before the boundary, so words are rarely split.
+Windows are transcribed in order. After each one its segments, shifted by the
+window's start time, are appended to a checkpoint (one JSON line per window),
+and to a partial .txt/.srt that can be read while the rest is still running.
+
+On a re-run with the same audio, model, language and task, the windows already
+in the checkpoint are reused and only the unfinished ones are transcribed. A
+line cut off by a crash is ignored, and that window is simply transcribed again.
+"""
+import json
+import os
+
+import numpy as np
+
+from audio import SAMPLE_RATE
+from subtitles import srt_entries
+
+FRAME = SAMPLE_RATE // 50  # 20 ms energy frames
+SEARCH_SECONDS = 30  # how far before each window boundary to look for a pause
+QUIET_SECONDS = 0.5  # length of the pause being looked for
+PROMPT_CHARS = 200  # text of the previous window passed on as context
+
+
+def quietest_point(audio, lo, hi):
+    """The sample in [lo, hi) at the centre of the quietest QUIET_SECONDS stretch."""
+    frames = (hi - lo) // FRAME
+    if frames < 1:
+        return hi
+    chunk = np.asarray(audio[lo:lo + frames * FRAME], dtype=np.float32).reshape(frames, FRAME)
+    energy = np.square(chunk).mean(axis=1)
+    width = max(1, int(QUIET_SECONDS * SAMPLE_RATE) // FRAME)
+    smoothed = np.convolve(energy, np.ones(width) / width, mode="same")
+    return lo + int(np.argmin(smoothed)) * FRAME + FRAME // 2
+
+
+def find_windows(audio, window_seconds):
+    """[[start, end]] sample ranges of about `window_seconds` each, cut at pauses."""
+    total = len(audio)
+    size = max(int(window_seconds * SAMPLE_RATE), 2 * SEARCH_SECONDS * SAMPLE_RATE)
+    windows, start = [], 0
+    while total - start > size:
+        target = start + size
+        cut = quietest_point(audio, target - SEARCH_SECONDS * SAMPLE_RATE, target)
+        windows.append([start, cut])
+        start = cut
+    windows.append([start, total])
+    return windows
+
+
+def load_checkpoint(path, header):
+    """{window index: record} of the windows finished for this exact job; empty if there is none."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        if json.loads(lines[0]) != header:
+            return {}
+    except (OSError, IndexError, ValueError):
+        return {}
+
+    done = {}
+    for line in lines[1:]:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            break  # cut off mid-write
+        done[record["window"]] = record
+    return done
+
+
+def append_line(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def shift_segments(segments, offset, length):
+    """Segments of one window moved to the recording's timeline (and kept inside the window)."""
+    shifted = []
+    for seg in segments:
+        seg = dict(seg)
+        seg["start"] = round(min(seg["start"], length) + offset, 3)
+        seg["end"] = round(min(seg["end"], length) + offset, 3)
+        if "words" in seg:
+            seg["words"] = [
+                {**w, "start": round(w["start"] + offset, 3), "end": round(w["end"] + offset, 3)} for w in seg["words"]
+            ]
+        shifted.append(seg)
+    return shifted
+
+
+def transcribe_segmented(model, model_name, audio, folder, window_seconds, language=None, task="transcribe", label=""):
+    """
+    model.transcribe(audio, language=language, task=task) window by window, checkpointed in `folder`.
+    Returns a Whisper-style result with the windows stitched together.
+    """
+    os.makedirs(folder, exist_ok=True)
+    windows = find_windows(audio, window_seconds)
+    header = {"task": task, "model": model_name, "language": language, "samples": len(audio), "windows": windows}
+    checkpoint = os.path.join(folder, f"{task}.checkpoint.jsonl")
+    partial_txt = os.path.join(folder, f"{task}.txt")
+    partial_srt = os.path.join(folder, f"{task}.srt")
+
+    done = load_checkpoint(checkpoint, header)
+    if done:
+        print(f"↩️ Resuming '{label}' ({task}): {len(done)}/{len(windows)} window(s) already done.")
+
+    # rewrite the files from the usable records, dropping any line cut off mid-write
+    records = [done[i] for i in range(len(windows)) if i in done]
+    with open(checkpoint, "w", encoding="utf-8") as f:
+        f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in [header] + records))
+    segments = [seg for r in records for seg in r["segments"]]
+    with open(partial_txt, "w", encoding="utf-8") as f:
+        f.write("".join(seg["text"] for seg in segments))
+    with open(partial_srt, "w", encoding="utf-8") as f:
+        f.write(srt_entries(segments))
+
+    detected = records[0]["language"] if records else language
+    for i, (start, end) in enumerate(windows):
+        if i in done:
+            continue
+        previous = done.get(i - 1)
+        prompt = previous["text"][-PROMPT_CHARS:] if previous else None
+        result = model.transcribe(audio[start:end], language=detected, task=task, initial_prompt=prompt)
+        detected = detected or result.get("language")
+        window_segments = shift_segments(result["segments"], start / SAMPLE_RATE, (end - start) / SAMPLE_RATE)
+        record = {"window": i, "language": detected, "text": result["text"], "segments": window_segments}
+
+        append_line(checkpoint, json.dumps(record, ensure_ascii=False) + "\n")
+        append_line(partial_txt, "".join(seg["text"] for seg in window_segments))
+        append_line(partial_srt, srt_entries(window_segments, first_index=len(segments) + 1))
+        segments.extend(window_segments)
+        done[i] = record
+        print(f"🧩 '{label}' ({task}): window {i + 1}/{len(windows)} done, {end / SAMPLE_RATE / 60:.1f} min transcribed.")
+
+    for seg_id, seg in enumerate(segments):
+        seg["id"] = seg_id
+    return {
+        "text": "".join(seg["text"] for seg in segments),
+        "segments": segments,
+        "language": detected or "unknown",
+    }
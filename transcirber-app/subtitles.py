@@ -0,0 +1,29 @@
+"""
+Subtitle formatting (.srt and .vtt) for Whisper segments.
+"""
+import datetime
+
+
+def format_timestamp(seconds: float) -> str:
+    return str(datetime.timedelta(seconds=round(seconds, 3))).replace(".", ",")
+
+
+def srt_entries(segments, first_index=1):
+    """The .srt text for `segments`, numbered from `first_index` (so entries can be appended to an existing file)."""
+    return "".join(
+        f"{i}\n{format_timestamp(seg['start'])} --> {format_timestamp(seg['end'])}\n{seg['text'].strip()}\n\n"
+        for i, seg in enumerate(segments, start=first_index)
+    )
+
+
+def write_srt(segments, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(srt_entries(segments))
+
+
+def write_vtt(segments, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("WEBVTT\n\n")
+        for seg in segments:
+            f.write(f"{format_timestamp(seg['start'])} --> {format_timestamp(seg['end'])}\n")
+            f.write(f"{seg['text'].strip()}\n\n")
@@ -1,18 +1,20 @@
 import os
-import re
 import json
-import datetime
 import time
 import warnings
 import argparse
-import whisper
-import ffmpeg
-from pydub import AudioSegment
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from tqdm import tqdm
-from pydub.utils import mediainfo
-from transformers import MarianMTModel, MarianTokenizer
 from transformers import logging as hf_logging
 import shutil
+from audio import AUDIO_EXTENSIONS, VIDEO_EXTENSIONS, decode_to_pcm, duration_seconds, load_pcm
+from model_registry import REGISTRY, MARIAN_MODELS
+from result_cache import RESULTS_DIR, ResultCache, SourceHashes, evict, touch
+from segmented import transcribe_segmented
+from subtitles import write_srt, write_vtt
+from translation import BATCH_SIZE, set_threads, translate_result
 
 warnings.filterwarnings("ignore", message="FP16 is not supported on CPU; using FP32 instead")
 warnings.filterwarnings("ignore", category=UserWarning, module="transformers")
@@ -21,15 +23,75 @@ warnings.filterwarnings("ignore", category=FutureWarning, module="transformers")
 INPUT_DIR = "input"
 CONVERTED_DIR = "converted"
 OUTPUT_DIR = "output"
+CACHE_DIR = "cache"
+PARTIAL_DIR = "partial"  # per-file checkpoints and partial output of --segmented runs
+QUEUE_SIZE = 2  # transcribed files waiting for translation (and translated files waiting to be written)
 
 def parse_args():
     parser = argparse.ArgumentParser(description="TBone's Transcriber App")
     parser.add_argument(
         "--clean",
         nargs="+",
-        choices=["input", "output", "converted", "all"],
+        choices=["input", "output", "converted", "cache", "all"],
         help="Clean one or more folders before running",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Ignore cached audio and results and redo every step (the new results are cached again)",
+    )
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=10240,
+        help="Size limit for decoded audio and cached results in MB; least recently used entries are removed beyond it (default: 10240)",
+    )
+    parser.add_argument(
+        "--model-memory-mb",
+        type=int,
+        default=0,
+        help="Memory budget for loaded models in MB; least recently used models are unloaded beyond it (default: no limit)",
+    )
+    parser.add_argument(
+        "--preload",
+        action="store_true",
+        help="Load the Whisper and translation models before the first file instead of on first use",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=0,
+        help="CPU threads used by torch for transcription and translation (default: torch's choice)",
+    )
+    parser.add_argument(
+        "--translate-batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help=f"Text chunks translated together per batch (default: {BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--segmented",
+        action="store_true",
+        help="Transcribe long recordings in windows cut at pauses, checkpointing each window so an interrupted run resumes where it stopped",
+    )
+    parser.add_argument(
+        "--window-minutes",
+        type=float,
+        default=10,
+        help="Approximate window length for --segmented (default: 10)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Transcription worker processes; each loads its own Whisper model and gets a share of --threads (default: 1)",
+    )
+    parser.add_argument(
+        "--convert-workers",
+        type=int,
+        default=2,
+        help="Files decoded in parallel ahead of transcription (default: 2)",
+    )
     return parser.parse_args()
 
 def clean_directories(targets):
@@ -37,6 +99,7 @@ def clean_directories(targets):
         "input": INPUT_DIR,
         "output": OUTPUT_DIR,
         "converted": CONVERTED_DIR,
+        "cache": CACHE_DIR,
     }
 
     folders = mapping.values() if "all" in targets else [mapping[t] for t in targets]
@@ -53,73 +116,42 @@ def clean_directories(targets):
                 print(f"⚠️ Could not delete {path}: {e}")
     print(f"🧹 Clean-up complete: {', '.join(targets)}")
 
-def convert_to_mp3(input_path, output_path):
-    audio = AudioSegment.from_file(input_path)
-    audio.export(output_path, format="mp3")
-
-def extract_audio_from_video(video_path, audio_path):
-    try:
-        ffmpeg.input(video_path).output(audio_path, format='mp3', acodec='libmp3lame', ac=1, ar='16k').overwrite_output().run(quiet=True)
-    except ffmpeg.Error as e:
-        print(f"❌ Error extracting audio from video '{video_path}': {e}")
-
-def format_timestamp(seconds: float) -> str:
-    return str(datetime.timedelta(seconds=round(seconds, 3))).replace(".", ",")
-
-def write_srt(segments, path):
-    with open(path, "w", encoding="utf-8") as f:
-        for i, seg in enumerate(segments, start=1):
-            f.write(f"{i}\n")
-            f.write(f"{format_timestamp(seg['start'])} --> {format_timestamp(seg['end'])}\n")
-            f.write(f"{seg['text'].strip()}\n\n")
-
-def write_vtt(segments, path):
-    with open(path, "w", encoding="utf-8") as f:
-        f.write("WEBVTT\n\n")
-        for seg in segments:
-            f.write(f"{format_timestamp(seg['start'])} --> {format_timestamp(seg['end'])}\n")
-            f.write(f"{seg['text'].strip()}\n\n")
-
-def prepare_files():
+def scan_inputs():
+    """(basename, path, extension) of every supported audio or video file in the input folder."""
     os.makedirs(CONVERTED_DIR, exist_ok=True)
-
-    prepared_files = []
-    seen = set()
-    files = sorted(os.listdir(INPUT_DIR))
-
     print("\n🔍 Scanning input folder for audio and video files...")
 
-    for filename in files:
-        filepath = os.path.join(INPUT_DIR, filename)
+    inputs = {}
+    for filename in sorted(os.listdir(INPUT_DIR)):
         basename, ext = os.path.splitext(filename)
         ext = ext.lower()
-
-        if ext not in [".mp3", ".wav", ".m4a", ".mp4", ".mov", ".mkv", ".webm"]:
+        if ext not in AUDIO_EXTENSIONS + VIDEO_EXTENSIONS:
             continue
-
-        if os.path.exists(os.path.join(CONVERTED_DIR, f"{basename}.mp3")):
-            print(f"⏩ Skipping '{basename}' — already converted and will be reused.")
-            prepared_files.append((basename, os.path.join(CONVERTED_DIR, f"{basename}.mp3")))
+        if basename in inputs:
+            # outputs are named after the basename, so only the first file of that name is used
+            print(f"⚠️ Skipping '{filename}' — '{os.path.basename(inputs[basename][1])}' has the same name.")
             continue
-
-        converted_path = os.path.join(CONVERTED_DIR, f"{basename}.mp3")
-
-        if os.path.exists(converted_path):
-            print(f"⏩ Skipping conversion for '{basename}' (already converted)")
-        elif ext == ".mp3":
-            print(f"🎧 Copying original MP3 '{filename}' to converted/")
-            shutil.copy2(filepath, converted_path)
-        elif ext in [".wav", ".m4a"]:
-            print(f"🎧 Converting '{filename}' to MP3...")
-            convert_to_mp3(filepath, converted_path)
-        elif ext in [".mp4", ".mov", ".mkv", ".webm"]:
-            print(f"🎞️ Extracting audio from video '{filename}' to MP3...")
-            extract_audio_from_video(filepath, converted_path)
-
-        if os.path.exists(converted_path):
-            prepared_files.append((basename, converted_path))
-
-    return prepared_files
+        inputs[basename] = (basename, os.path.join(INPUT_DIR, filename), ext)
+    return list(inputs.values())
+
+def convert_file(basename, filepath, ext, source_sha, force=False):
+    """
+    Decode one input to converted/<content hash>.pcm, reusing an earlier decode of the same content.
+    Returns the path, or None if decoding failed.
+    """
+    pcm_path = os.path.join(CONVERTED_DIR, f"{source_sha}.pcm")
+
+    if os.path.exists(pcm_path) and not force:
+        print(f"⏩ Skipping '{basename}' — already decoded and will be reused.")
+        touch(pcm_path)
+    elif ext in VIDEO_EXTENSIONS:
+        print(f"🎞️ Extracting audio from video '{os.path.basename(filepath)}' ...")
+        decode_to_pcm(filepath, pcm_path)
+    else:
+        print(f"🎧 Decoding '{os.path.basename(filepath)}' ...")
+        decode_to_pcm(filepath, pcm_path)
+
+    return pcm_path if os.path.exists(pcm_path) else None
 
 def write_outputs(result, output_folder, lang_suffix):
     lang_folder = os.path.join(output_folder, lang_suffix)
@@ -135,116 +167,257 @@ def write_outputs(result, output_folder, lang_suffix):
     write_srt(result["segments"], base + ".srt")
     write_vtt(result["segments"], base + ".vtt")
 
-def transcribe_files(files, language=None, model_name="base"):
-    model = whisper.load_model(model_name)
+def init_inference_worker(threads, model_name, preload):
+    """Runs once in every inference worker process."""
+    warnings.filterwarnings("ignore", message="FP16 is not supported on CPU; using FP32 instead")
+    set_threads(threads)
+    if preload:
+        REGISTRY.whisper(model_name)
+
+def whisper_key(cache, source_sha, model_name, language, task, window_minutes):
+    return cache.key(
+        source=source_sha, model=model_name, language=language or "auto", task=task, window_minutes=window_minutes
+    )
+
+def cached_whisper(cache, key):
+    """The cached {"duration", "result"} record of a Whisper pass, or None."""
+    record = cache.get(key)
+    return record if record is not None and "duration" in record else None
+
+def cached_transcription(cache, source_sha, language, model_name, window_minutes):
+    """(result, English result, duration) if every Whisper pass for this content is cached, else None."""
+    record = cached_whisper(cache, whisper_key(cache, source_sha, model_name, language, "transcribe", window_minutes))
+    if record is None:
+        return None
+    result = record["result"]
+    english = result
+    original_lang = result.get("language", language or "unknown")
+    if original_lang != "en":
+        translated = cached_whisper(cache, whisper_key(cache, source_sha, model_name, original_lang, "translate", window_minutes))
+        if translated is None:
+            return None
+        english = translated["result"]
+    return result, english, record["duration"]
+
+def transcribe_audio(basename, pcm_path, source_sha, language, model_name, cache, window_minutes=0):
+    """
+    The Whisper passes for one file: the transcript, plus an English translation when
+    the audio isn't English. Returns (result, English result, duration in seconds).
+    With `window_minutes`, both passes run window by window with checkpoints.
+    Passes already in the cache are not run again.
+    """
+    audio = load_pcm(pcm_path)
+    duration_sec = duration_seconds(audio)
+
+    def run(language, task):
+        key = whisper_key(cache, source_sha, model_name, language, task, window_minutes)
+        record = cached_whisper(cache, key)
+        if record is not None:
+            print(f"⏩ Reusing cached {task} result for '{basename}'.")
+            return record["result"]
+
+        # looked up per pass so a model unloaded under --model-memory-mb is not kept alive
+        model = REGISTRY.whisper(model_name)
+        if not window_minutes:
+            result = model.transcribe(audio, language=language, task=task)
+        else:
+            folder = os.path.join(OUTPUT_DIR, basename, PARTIAL_DIR)
+            result = transcribe_segmented(
+                model, model_name, audio, folder, window_minutes * 60, language=language, task=task, label=basename
+            )
+        # the duration is stored too, so a fully cached file needs no decoding at all
+        cache.put(key, {"duration": duration_sec, "result": result})
+        return result
+
+    result = run(language, "transcribe")
+    original_lang = result.get("language", language or "unknown")
+    english = result
+    if original_lang != "en":
+        english = run(original_lang, "translate")
+    return result, english, duration_sec
+
+def make_inference_pool(workers, threads, model_name, preload):
+    """One in-process worker thread, or `workers` processes that split the torch threads between them."""
+    if workers <= 1:
+        return ThreadPoolExecutor(max_workers=1)
+    per_worker = max(1, (threads or os.cpu_count() or 1) // workers)
+    print(f"🧵 Running {workers} transcription workers with {per_worker} thread(s) each.")
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_inference_worker,
+        initargs=(per_worker, model_name, preload),
+    )
+
+def transcribe_files(files, language=None, model_name="base", workers=1, convert_workers=2, threads=0,
+                     preload=False, translate_batch_size=BATCH_SIZE, window_minutes=0, force=False):
+    """
+    Run every input through the pipeline: decode (thread pool) → transcribe (inference
+    workers) → translate (thread) → write (thread), connected by bounded queues so the
+    stages overlap across files. A failing file is reported and skipped; the rest carry on.
+    """
     if not files:
         print("⚠️ No valid audio or video files found in the input folder. Exiting.")
         return
 
+    total = len(files)
+    sources = SourceHashes(CACHE_DIR)
+    cache = ResultCache(CACHE_DIR, force=force)
+    started = {}  # basename -> when the decode stage picked the file up
     done_messages = []
+    failures = []
+    translate_queue = queue.Queue(maxsize=QUEUE_SIZE)
+    write_queue = queue.Queue(maxsize=QUEUE_SIZE)
+
+    def fail(basename, stage, error):
+        print(f"❌ Error during {stage} of '{basename}': {error}")
+        failures.append(basename)
+
+    decode_locks = {}  # content hash -> lock, so identical inputs are decoded once
+    decoded = set()  # content hashes decoded during this run (reused even with --force)
+    locks_lock = threading.Lock()
+
+    def convert(basename, filepath, ext):
+        """Returns (decoded path, content hash, cached Whisper results); a full cache hit skips decoding."""
+        # timed from here rather than from submission, so time spent queued isn't counted
+        started[basename] = time.time()
+        source_sha = sources.sha256(filepath)
+        cached = cached_transcription(cache, source_sha, language, model_name, window_minutes)
+        if cached is not None:
+            print(f"⏩ Reusing cached transcription of '{basename}' — no decoding needed.")
+            return None, source_sha, cached
+        with locks_lock:
+            decode_lock = decode_locks.setdefault(source_sha, threading.Lock())
+        with decode_lock:
+            pcm_path = convert_file(basename, filepath, ext, source_sha, force and source_sha not in decoded)
+            decoded.add(source_sha)
+        return pcm_path, source_sha, None
+
+    def translate_stage():
+        translations = {}
+        while (item := translate_queue.get()) is not None:
+            basename, source_sha, result, english, duration_sec = item
+            try:
+                original_lang = result.get("language", language or "unknown")
+                outputs = [(original_lang, result)]
+                # the translation models take English, so no/sv are translated from the English transcript
+                for target_lang in ["en", "no", "sv"]:
+                    if target_lang == original_lang:
+                        continue
+                    if target_lang == "en":
+                        outputs.append(("en", english))
+                    else:
+                        key = cache.key(
+                            source=source_sha,
+                            model=model_name,
+                            language=language or "auto",
+                            window_minutes=window_minutes,
+                            task=f"translate:{target_lang}",
+                            translator=MARIAN_MODELS[target_lang],
+                        )
+                        # translations from this run are reused even with --force (identical inputs)
+                        translated = translations.get(key) or cache.get(key)
+                        if translated is None:
+                            print(f"🌍 Translating {basename} transcript → {target_lang.upper()} ...")
+                            translated = translate_result(english, target_lang, batch_size=translate_batch_size)
+                            cache.put(key, translated)
+                            translations[key] = translated
+                        else:
+                            print(f"⏩ Reusing cached {target_lang.upper()} translation for '{basename}'.")
+                        outputs.append((target_lang, translated))
+                write_queue.put((basename, outputs, duration_sec))
+            except Exception as e:
+                fail(basename, "translation", e)
+        write_queue.put(None)
 
-    for basename, mp3_path in files:
-        print(f"🔊 Transcribing {basename}.mp3 with input language '{language or 'auto'}' ...")
-
-        start_time = time.time()
-        info = mediainfo(mp3_path)
-        duration_sec = float(info['duration'])
-
-        try:
-            result = model.transcribe(mp3_path, language=language)
-            original_lang = result.get("language", language or "unknown")
-            if language is None:
-                print(f"🧠 Detected language for '{basename}': {original_lang}")
-
-            output_folder = os.path.join(OUTPUT_DIR, basename)
-            os.makedirs(output_folder, exist_ok=True)
-
-            # Save original transcription
-            write_outputs(result, output_folder, lang_suffix=original_lang)
-
-            # Define which languages to generate
-            lang_targets = ["en", "no", "sv"]
-            if original_lang in lang_targets:
-                lang_targets.remove(original_lang)
-
-            for target_lang in lang_targets:
-                if target_lang == "en":
-                    print(f"🌍 Translating {basename} transcript → English ...")
-                    translated = model.transcribe(mp3_path, language=original_lang, task="translate")
-                    write_outputs(translated, output_folder, lang_suffix="en")
-                else:
-                    print(f"🌍 Translating {basename} transcript → {target_lang.upper()} ...")
-                    translated_text = translate_text(result["text"], target_lang)
-                    translated_result = result.copy()
-                    translated_result["text"] = translated_text
-                    write_outputs(translated_result, output_folder, lang_suffix=target_lang)
-
-            elapsed = time.time() - start_time
-            done_messages.append(
-                f"✅ Done transcribing and translating '{basename}.mp3' — {round(duration_sec / 60, 1)} min audio in {round(elapsed / 60, 1)} min using {model_name.capitalize()} model. Check `./output/{basename}/` for results."
-            )
+    def write_stage():
+        while (item := write_queue.get()) is not None:
+            basename, outputs, duration_sec = item
+            try:
+                output_folder = os.path.join(OUTPUT_DIR, basename)
+                os.makedirs(output_folder, exist_ok=True)
+                for lang_suffix, result in outputs:
+                    write_outputs(result, output_folder, lang_suffix=lang_suffix)
+                # the checkpoints of a --segmented run are only needed until the outputs exist
+                shutil.rmtree(os.path.join(output_folder, PARTIAL_DIR), ignore_errors=True)
+                elapsed = time.time() - started[basename]
+                done_messages.append(
+                    f"✅ Done transcribing and translating '{basename}' — {round(duration_sec / 60, 1)} min audio in {round(elapsed / 60, 1)} min using {model_name.capitalize()} model. Check `./output/{basename}/` for results."
+                )
+                print(f"💾 [{len(done_messages) + len(failures)}/{total}] Wrote outputs for '{basename}'.")
+            except Exception as e:
+                fail(basename, "writing", e)
 
-        except Exception as e:
-            print(f"❌ Error during transcription of '{basename}': {e}")
+    stages = [threading.Thread(target=translate_stage), threading.Thread(target=write_stage)]
+    for stage in stages:
+        stage.start()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, convert_workers)) as convert_pool, \
+                make_inference_pool(workers, threads, model_name, preload) as inference_pool:
+            pending = {}
+            transcribing = {}  # content hash -> basenames waiting for its transcription
+            transcribed = {}  # content hash -> Whisper results from this run
+            for basename, filepath, ext in files:
+                future = convert_pool.submit(convert, basename, filepath, ext)
+                pending[future] = ("conversion", basename, None)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, basename, source_sha = pending.pop(future)
+                    # a transcription is shared by every file with the same content
+                    names = transcribing.pop(source_sha) if stage == "transcription" else [basename]
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        for name in names:
+                            fail(name, stage, e)
+                        continue
+
+                    if stage == "conversion":
+                        pcm_path, source_sha, cached = value
+                        if cached is None:
+                            cached = transcribed.get(source_sha)
+                        if cached is not None:
+                            translate_queue.put((basename, source_sha, *cached))
+                            continue
+                        if source_sha in transcribing:
+                            print(f"⏩ '{basename}' has the same content as '{transcribing[source_sha][0]}' and will share its transcription.")
+                            transcribing[source_sha].append(basename)
+                            continue
+                        if pcm_path is None:
+                            fail(basename, stage, "no audio could be decoded")
+                            continue
+                        print(f"🔊 Transcribing '{basename}' with input language '{language or 'auto'}' ...")
+                        future = inference_pool.submit(
+                            transcribe_audio, basename, pcm_path, source_sha, language, model_name, cache, window_minutes
+                        )
+                        pending[future] = ("transcription", basename, source_sha)
+                        transcribing[source_sha] = [basename]
+                    else:
+                        transcribed[source_sha] = value
+                        result, english, duration_sec = value
+                        for name in names:
+                            if language is None:
+                                print(f"🧠 Detected language for '{name}': {result.get('language', 'unknown')}")
+                            # blocks while translation is QUEUE_SIZE files behind
+                            translate_queue.put((name, source_sha, result, english, duration_sec))
+    finally:
+        translate_queue.put(None)
+        for stage in stages:
+            stage.join()
+        sources.save()
 
     for msg in done_messages:
         print(msg)
-
-def split_into_chunks(text, tokenizer, max_tokens=490):
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    chunks = []
-    current = ""
-
-    for sentence in sentences:
-        test = current + sentence + " "
-        token_count = len(tokenizer.encode(test))
-        if token_count < max_tokens:
-            current = test
-        else:
-            if current:
-                chunks.append(current.strip())
-            current = sentence + " "
-
-    if current:
-        chunks.append(current.strip())
-
-    return chunks
-
-
-def translate_text(text, target_lang):
-    lang_map = {
-        "no": "Neurora/opus-tatoeba-eng-nor-bt",
-        "sv": "Helsinki-NLP/opus-mt-en-sv"
-    }
-
-    if target_lang not in lang_map:
-        raise ValueError(f"Unsupported target language: {target_lang}")
-
-    model_name = lang_map[target_lang]
-    tokenizer = MarianTokenizer.from_pretrained(model_name)
-    model = MarianMTModel.from_pretrained(model_name)
-
-    chunks = split_into_chunks(text, tokenizer)
-    translated_chunks = []
-
-    for idx, chunk in enumerate(chunks):
-        token_count = len(tokenizer.encode(chunk))
-        if token_count > 490:
-            print(f"⚠️ Skipping chunk {idx} – still too long: {token_count} tokens")
-            continue
-
-        encoded = tokenizer(chunk, return_tensors="pt")
-        output = model.generate(**encoded)
-        decoded = tokenizer.decode(output[0], skip_special_tokens=True)
-        translated_chunks.append(decoded)
-
-    return " ".join(translated_chunks)
+    if failures:
+        print(f"⚠️ {len(failures)} of {total} file(s) failed: {', '.join(failures)}")
 
 def ask_language():
     options = {"no", "sv", "en", "auto"}
 
     print("\n👋 Welcome to **TBone's Transcriber App**")
-    print("This app will convert sound or video files into MP3, and transcribe them into various formats and languages.\n")
+    print("This app will decode sound or video files, and transcribe them into various formats and languages.\n")
 
     print("🌐 Choose input-language for transcription:")
     print("   no   = Norwegian")
@@ -280,16 +453,40 @@ if __name__ == "__main__":
     os.makedirs(INPUT_DIR, exist_ok=True)
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     os.makedirs(CONVERTED_DIR, exist_ok=True)
+    os.makedirs(CACHE_DIR, exist_ok=True)
 
     if args.clean:
         clean_directories(args.clean)
-        if len(vars(args)) == 1:  # no other args provided
-            exit(0)
+        exit(0)
+
+    REGISTRY.budget_mb = args.model_memory_mb
+    set_threads(args.threads)
 
     language = ask_language()
     model_name = ask_model()
-    files = prepare_files()
-    transcribe_files(files, language=language, model_name=model_name)
+
+    if args.preload:
+        # with worker processes each worker preloads its own Whisper model
+        whisper_models = [("whisper", model_name)] if args.workers <= 1 else []
+        REGISTRY.preload(whisper_models + [("marian", lang) for lang in MARIAN_MODELS])
+
+    files = scan_inputs()
+    transcribe_files(
+        files,
+        language=language,
+        model_name=model_name,
+        workers=args.workers,
+        convert_workers=args.convert_workers,
+        threads=args.threads,
+        preload=args.preload,
+        translate_batch_size=args.translate_batch_size,
+        window_minutes=args.window_minutes if args.segmented else 0,
+        force=args.force,
+    )
+
+    deleted, freed = evict([CONVERTED_DIR, os.path.join(CACHE_DIR, RESULTS_DIR)], args.cache_size_mb * 2**20)
+    if deleted:
+        print(f"🧹 Removed {deleted} least recently used cache file(s) ({freed / 2**20:.0f} MB) to stay within {args.cache_size_mb} MB.")
 
     print("\n✅ Done! 🎉")
     print("💡 Tip: If you want to clear all files, run:\n   `python transcribe.py --clean all`")
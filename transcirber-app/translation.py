@@ -0,0 +1,105 @@
+"""
+Batched MarianMT translation of Whisper transcripts.
+
+Every sentence is tokenized once, and those token counts drive a single greedy
+pass that packs sentences into chunks below the model's input limit. All chunks
+of a transcript are then sorted by length and sent through `generate` in padded
+batches under torch.inference_mode, so similar-length chunks share a batch and
+little time is spent on padding.
+
+Segments are translated one by one (batched together), which keeps each
+segment's start and end time: the translated .srt/.vtt files line up with the
+audio just like the original ones.
+"""
+import re
+
+import torch
+
+from model_registry import REGISTRY
+
+MAX_TOKENS = 490  # Marian models accept 512 positions; leave room for special tokens
+BATCH_SIZE = 16
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def set_threads(threads):
+    """Use `threads` CPU threads for torch (transcription and translation); 0 keeps torch's default."""
+    if threads:
+        torch.set_num_threads(threads)
+
+
+def split_sentences(text):
+    return [s for s in SENTENCE_END.split(text.strip()) if s]
+
+
+def chunk_sentences(sentences, counts, max_tokens=MAX_TOKENS):
+    """
+    Pack consecutive sentences into chunks of at most `max_tokens` tokens, using the
+    per-sentence token counts. Returns [(chunk text, token count)].
+    A single sentence longer than the limit becomes its own chunk (it is truncated when encoded).
+    """
+    chunks = []
+    current, size = [], 0
+    for sentence, count in zip(sentences, counts):
+        if current and size + count > max_tokens:
+            chunks.append((" ".join(current), size))
+            current, size = [], 0
+        current.append(sentence)
+        size += count
+    if current:
+        chunks.append((" ".join(current), size))
+    return chunks
+
+
+def translate_texts(texts, target_lang, batch_size=BATCH_SIZE, max_tokens=MAX_TOKENS):
+    """Translate each English text in `texts` into `target_lang`. Returns one translation per text."""
+    tokenizer, model = REGISTRY.marian(target_lang)
+
+    sentences = [split_sentences(text) for text in texts]
+    flat = [s for group in sentences for s in group]
+    if not flat:
+        return ["" for _ in texts]
+    counts = iter(len(ids) for ids in tokenizer(flat, add_special_tokens=False)["input_ids"])
+
+    chunks = []  # (text index, chunk text, token count)
+    for i, group in enumerate(sentences):
+        for chunk, size in chunk_sentences(group, [next(counts) for _ in group], max_tokens):
+            if size > max_tokens:
+                print(f"⚠️ A sentence of {size} tokens exceeds the {max_tokens}-token limit and will be truncated.")
+            chunks.append((i, chunk, size))
+
+    order = sorted(range(len(chunks)), key=lambda c: chunks[c][2], reverse=True)
+    decoded = [""] * len(chunks)
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            encoded = tokenizer(
+                [chunks[c][1] for c in batch],
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=max_tokens,
+            )
+            output = model.generate(**encoded)
+            for c, text in zip(batch, tokenizer.batch_decode(output, skip_special_tokens=True)):
+                decoded[c] = text
+
+    translated = [[] for _ in texts]
+    for (i, _, _), text in zip(chunks, decoded):
+        translated[i].append(text)
+    return [" ".join(parts) for parts in translated]
+
+
+def translate_result(result, target_lang, batch_size=BATCH_SIZE):
+    """A copy of a Whisper result with every segment (and the full text) translated into `target_lang`."""
+    segments = result.get("segments", [])
+    texts = translate_texts([seg["text"] for seg in segments], target_lang, batch_size=batch_size)
+    translated = dict(result)
+    # token ids belong to the original text, so they are not carried over
+    translated["segments"] = [
+        {**{k: v for k, v in seg.items() if k != "tokens"}, "text": f" {text}" if text else ""}
+        for seg, text in zip(segments, texts)
+    ]
+    translated["text"] = " ".join(text for text in texts if text)
+    translated["language"] = target_lang
+    return translated